@@ -0,0 +1,97 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' loads every image, sound effect, and music file before the game starts, so nothing is loaded mid-game.
+files are read and decoded on a worker thread.
+images have to be converted for the display on the main thread, see Preloader.poll '''
+
+import io
+import os
+import queue
+import threading
+
+import pygame
+import atlas
+
+# caches, shared with objects (objects.imgs and objects.sounds)
+imgs = {} # name: Surface
+sounds = {} # name: pygame.mixer.Sound
+music = {} # name: bytes of mp3 file
+
+# folders to load and how to load each kind of file. images are loaded from the atlas (see atlas.py)
+FOLDERS = [('sound', '.mp3', 'sound'), ('music', '.mp3', 'music')] # (folder, extension, kind)
+
+
+### HELPER FUNCTIONS ###
+def load_image(name):
+    ''' returns image from img/name.png, loading it if it wasn't preloaded '''
+    if name not in imgs: imgs[name] = pygame.image.load('img/'+name+'.png').convert_alpha()
+    return imgs[name]
+
+def load_sound(name):
+    ''' returns sound effect from sound/name.mp3, loading it if it wasn't preloaded '''
+    if name not in sounds: sounds[name] = pygame.mixer.Sound('sound/'+name+'.mp3')
+    return sounds[name]
+
+def music_file(name):
+    ''' file object (or path, if it wasn't preloaded) for music/name.mp3 to pass to pygame.mixer.music '''
+    if name in music: return io.BytesIO(music[name])
+    return f'music/{name}.mp3'
+
+
+### PRELOADER ###
+class Preloader(object):
+    ''' loads every asset on a worker thread.
+    progress: function called on the main thread with (files loaded, total files) after each file '''
+    def __init__(self, progress=None):
+        self.files = [('atlas', '', atlas.ATLAS_PATH)] +[(kind, folder, name) for folder, ext, kind in FOLDERS 
+            if os.path.isdir(folder) for name in sorted(os.listdir(folder)) if name.endswith(ext)]
+        self.total = len(self.files)
+        self.done = 0 # files loaded and handed to the main thread
+        self.progress = progress
+        self.loaded = queue.Queue() # (kind, name, data) decoded by the worker, waiting for poll
+        self.error = None # exception raised by the worker
+        self.thread = threading.Thread(target=self.work, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def work(self):
+        ''' runs on the worker thread. reads and decodes every file '''
+        try:
+            for kind, folder, filename in self.files:
+                path = os.path.join(folder, filename)
+                name = os.path.splitext(filename)[0]
+                if kind == 'atlas': data = atlas.read() # every image, rebuilt if any changed
+                elif kind == 'sound':
+                    try: data = pygame.mixer.Sound(path)
+                    except pygame.error: data = None # no audio device
+                else:
+                    with open(path, 'rb') as f: data = f.read()
+                self.loaded.put((kind, name, data))
+        except Exception as e:
+            self.error = e
+            self.loaded.put(None)
+
+    def poll(self, wait=False):
+        ''' runs on the main thread. stores files the worker has finished.
+        wait: wait until every file is loaded
+        returns whether every file is loaded '''
+        while self.done < self.total:
+            try: item = self.loaded.get(block=wait)
+            except queue.Empty: break
+            if item == None: raise self.error
+            kind, name, data = item
+            if kind == 'atlas': 
+                rects, surface = data
+                imgs.update(atlas.split(rects, surface.convert_alpha()))
+            elif kind == 'sound' and data != None: sounds[name] = data
+            elif kind == 'music': music[name] = data
+            self.done += 1
+            if self.progress: self.progress(self.done, self.total)
+        return self.done == self.total
+
+    def finish(self):
+        ''' wait for every file to load (calling progress as they do) '''
+        self.poll(wait=True)
+        self.thread.join()
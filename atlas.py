@@ -0,0 +1,109 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' texture atlas: every image in img/ packed into one file, so startup reads one file instead of decoding every PNG.
+the file is an index (JSON) of where each image is, followed by the raw RGBA pixels of the whole atlas.
+it's rebuilt automatically when an image in img/ is added, removed, or changed.
+usage: python atlas.py (rebuild and print load times) '''
+
+import json
+import os
+import struct
+import time
+
+import pygame
+
+IMG_DIR = 'img'
+ATLAS_PATH = 'atlas.bin' # generated, not committed
+MAGIC = b'ATL1'
+HEADER = struct.Struct('<4sI') # magic, length of index JSON
+PADDING = 1 # pixels between images
+
+
+### HELPER FUNCTIONS ###
+def sources():
+    ''' {image name: [modified time, file size]} for every PNG in IMG_DIR '''
+    found = {}
+    for filename in sorted(os.listdir(IMG_DIR)):
+        if not filename.endswith('.png'): continue
+        stat = os.stat(os.path.join(IMG_DIR, filename))
+        found[filename[:-4]] = [stat.st_mtime_ns, stat.st_size]
+    return found
+
+def read_index(path=ATLAS_PATH):
+    ''' returns index of an atlas file, or None if it doesn't exist or isn't an atlas '''
+    try:
+        with open(path, 'rb') as f:
+            magic, index_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC: return None
+            return json.loads(f.read(index_len))
+    except (OSError, struct.error, ValueError): return None
+
+def stale(path=ATLAS_PATH):
+    ''' whether the atlas is missing or older than the images in IMG_DIR '''
+    index = read_index(path)
+    return index == None or index['sources'] != sources()
+
+def pack(sizes):
+    ''' place rectangles on shelves (rows), tallest first.
+    sizes: {name: (width, height)}
+    returns atlas size and {name: [x, y, width, height]} '''
+    area = sum((w +PADDING)*(h +PADDING) for w, h in sizes.values())
+    width = max(max(w for w, h in sizes.values()) +PADDING, int(area**.5) +1)
+    rects, x, y, shelf_h = {}, 0, 0, 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x +w > width: x, y, shelf_h = 0, y +shelf_h, 0 # start a new shelf
+        rects[name] = [x, y, w, h]
+        x += w +PADDING
+        shelf_h = max(shelf_h, h +PADDING)
+    return (width, y +shelf_h), rects
+
+
+### BUILDING AND LOADING ###
+def build(path=ATLAS_PATH):
+    ''' pack every image in IMG_DIR into an atlas file '''
+    found = sources()
+    images = {name: pygame.image.load(os.path.join(IMG_DIR, name+'.png')) for name in found}
+    size, rects = pack({name: img.get_size() for name, img in images.items()})
+    atlas = pygame.Surface(size, pygame.SRCALPHA, 32)
+    for name, img in images.items(): atlas.blit(img, rects[name][:2], special_flags=pygame.BLEND_RGBA_ADD) # copy pixels exactly, without blending
+    index = json.dumps({'size': size, 'rects': rects, 'sources': found}).encode()
+    with open(path +'.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        f.write(pygame.image.tobytes(atlas, 'RGBA'))
+    os.replace(path +'.tmp', path) # so a half written atlas is never read
+
+def read(path=ATLAS_PATH):
+    ''' read the atlas, rebuilding it first if it's stale.
+    returns {image name: Rect} and the atlas Surface (not converted for the display, see load) '''
+    if stale(path): build(path)
+    with open(path, 'rb') as f: data = f.read() # whole file in one read
+    magic, index_len = HEADER.unpack_from(data)
+    index = json.loads(data[HEADER.size:HEADER.size +index_len])
+    surface = pygame.image.frombuffer(memoryview(data)[HEADER.size +index_len:], tuple(index['size']), 'RGBA')
+    return {name: pygame.Rect(rect) for name, rect in index['rects'].items()}, surface
+
+def load(path=ATLAS_PATH):
+    ''' returns {image name: Surface} for every image in IMG_DIR, from the atlas.
+    needs a display to convert the atlas (see assets.Preloader, which reads on a worker thread and converts on the main thread) '''
+    rects, surface = read(path)
+    return split(rects, surface.convert_alpha())
+
+def split(rects, surface):
+    ''' {image name: Surface} of each image in an atlas Surface. images share the atlas's pixels '''
+    return {name: surface.subsurface(rect) for name, rect in rects.items()}
+
+
+if __name__ == '__main__':
+    # rebuild atlas and compare load times
+    pygame.display.set_mode((1, 1))
+    start = time.perf_counter()
+    build()
+    print(f'built {ATLAS_PATH} in {(time.perf_counter() -start)*1000:.1f} ms ({os.path.getsize(ATLAS_PATH)//1024} KB)')
+    start = time.perf_counter()
+    pngs = {name: pygame.image.load(os.path.join(IMG_DIR, name+'.png')).convert_alpha() for name in sources()}
+    print(f'{len(pngs)} PNGs loaded in {(time.perf_counter() -start)*1000:.2f} ms')
+    start = time.perf_counter()
+    imgs = load()
+    print(f'{len(imgs)} images loaded from atlas in {(time.perf_counter() -start)*1000:.2f} ms')
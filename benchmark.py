@@ -0,0 +1,210 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' per-room benchmark.
+builds every room at every difficulty and entrance direction, plays it with scripted inputs,
+and writes construction, update, and draw times as JSON.
+also measures time to first frame when starting the game.
+usage: python benchmark.py [--frames 600] [--out bench.json] [--compare old.json]
+or, to time a room full of arrows: python benchmark.py --arrows 5000 '''
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import pygame
+import game as game_module
+
+# benchmark settings
+DIFFICULTIES = [0, 1, 2, 3]
+SCREEN_SIZE = (1680, 945) # window size of a 1920 pixel wide monitor
+SEED = 0
+BOOT_RUNS = 3 # times to start the game when measuring time to first frame
+BOOT_SCRIPT = 'import json, main; main.FULLSCREEN = False; main.DEBUG_BOOT = False; print(json.dumps(main.run(boot_only=True)))'
+SCRIPT = [ # scripted inputs, repeated. format: (frames, keys held down)
+    (30, [pygame.K_d]), (30, [pygame.K_s]), (30, [pygame.K_a, pygame.K_w]),
+    (15, [pygame.K_d, pygame.K_w]), (20, []), (10, [pygame.K_a, pygame.K_SPACE]),
+    (30, [pygame.K_w]), (25, [pygame.K_d, pygame.K_s, pygame.K_SPACE]) ]
+
+
+### HELPER FUNCTIONS ###
+def script_inputs(frames):
+    ''' returns list of Inputs for each frame, following SCRIPT '''
+    inputs = []
+    while len(inputs) < frames:
+        for length, keys in SCRIPT: inputs += [game_module.Inputs(keys)]*length
+    return inputs[:frames]
+
+def percentile(times, p):
+    ''' p-th percentile (0 to 100) of a list of times '''
+    times = sorted(times)
+    return times[min(len(times)-1, int(len(times)*p/100))]
+
+def summarize(times):
+    ''' mean, p95, and p99 of a list of times in seconds, in milliseconds '''
+    if not times: return {'mean': 0, 'p95': 0, 'p99': 0}
+    return {'mean': round(sum(times)/len(times)*1000, 4), 'p95': round(percentile(times, 95)*1000, 4),
+        'p99': round(percentile(times, 99)*1000, 4)}
+
+def git_commit():
+    try: return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception: return None
+
+def scenarios(room_nums=None):
+    ''' every (room number, difficulty, entrance direction) combination to benchmark '''
+    for room_num, data in game_module.ROOM_LOADING_DATA.items():
+        if room_nums and room_num not in room_nums: continue
+        for difficulty in DIFFICULTIES:
+            for entrance_dir in data['enter_dirs']: yield room_num, difficulty, entrance_dir
+
+
+### BENCHMARK ###
+def build_room(game, room_num, difficulty, entrance_dir):
+    ''' build a room and put the player in it. returns construction time in seconds '''
+    import rooms
+    start = time.perf_counter()
+    game.room = rooms.build(room_num, difficulty, entrance_dir)
+    construct_time = time.perf_counter() -start
+    game.room_to_clears.setdefault(room_num, 0)
+    game.room_to_deaths.setdefault(room_num, 0)
+    game.player.keys = []
+    game.player.set_color('def')
+    game.room.enter(game.player)
+    game.player.rect.center = game.room.rect.center
+    return construct_time
+
+def warm_up(game, room_nums=None):
+    ''' build every room once so image loading and layout compiling aren't counted in any times.
+    includes every starting room entered from nowhere (built by Game.reset when the player dies), whatever room_nums is '''
+    for room_num, difficulty, entrance_dir in scenarios(room_nums): build_room(game, room_num, difficulty, entrance_dir)
+    for room_num in sorted(game.start_rooms):
+        for difficulty in DIFFICULTIES: build_room(game, room_num, difficulty, 0)
+
+def run_scenario(game, room_num, difficulty, entrance_dir, frames, draw=True):
+    ''' play a room for a number of frames.
+    the room is rebuilt (untimed) if the player dies or leaves it. 
+    frames where that happens also build a room inside game.step (reset or load_room), so they're timed separately as transitions '''
+    import main as renderer
+    random.seed(f'{SEED}-{room_num}-{difficulty}-{entrance_dir}')
+    construct_time = build_room(game, room_num, difficulty, entrance_dir)
+    update_times, transition_times, draw_times, rebuilds, max_objs = [], [], [], 0, 0
+    for inputs in script_inputs(frames):
+        room = game.room
+        start = time.perf_counter()
+        game.step(inputs)
+        elapsed = time.perf_counter() -start
+        if game.room is room: update_times.append(elapsed)
+        else:
+            # player died or went through a door
+            transition_times.append(elapsed)
+            build_room(game, room_num, difficulty, entrance_dir)
+            rebuilds += 1
+        max_objs = max(max_objs, len(game.room.objs) +game.room.arrows.count)
+        if draw:
+            start = time.perf_counter()
+            renderer.draw_world()
+            draw_times.append(time.perf_counter() -start)
+    return {'room': room_num, 'difficulty': difficulty, 'entrance_dir': entrance_dir,
+        'construct_ms': round(construct_time*1000, 4), 'update_ms': summarize(update_times),
+        'transition_ms': summarize(transition_times), 'draw_ms': summarize(draw_times), 'max_objs': max_objs, 'rebuilds': rebuilds}
+
+def run_arrows(game, count, frames, draw=True):
+    ''' play the bullet hell room (R5) with count arrows in it, replacing arrows as they leave the screen.
+    the player stands off screen so it isn't killed '''
+    import main as renderer
+    random.seed(SEED)
+    build_room(game, 5, 3, 'left')
+    room = game.room
+    game.player.rect.bottomright = (-game.screen_width, -game.screen_height)
+    width, height = game.screen_width, game.screen_height
+    update_times, draw_times = [], []
+    for _ in range(frames):
+        while room.arrows.count < count:
+            dir = random.choice(['left', 'right', 'up', 'down'])
+            if dir == 'right': room.arrows.spawn(random.uniform(-width, 0), random.randint(0, height))
+            elif dir == 'left': room.arrows.spawn(random.uniform(0, width*2), random.randint(0, height), dir)
+            elif dir == 'down': room.arrows.spawn(random.randint(0, width), random.uniform(-height, 0), dir)
+            else: room.arrows.spawn(random.randint(0, width), random.uniform(0, height*2), dir)
+        start = time.perf_counter()
+        game.step(game_module.Inputs())
+        update_times.append(time.perf_counter() -start)
+        if draw:
+            start = time.perf_counter()
+            renderer.draw_world(game.alpha)
+            draw_times.append(time.perf_counter() -start)
+    return {'arrows': count, 'update_ms': summarize(update_times), 'draw_ms': summarize(draw_times)}
+
+def measure_boot(runs=BOOT_RUNS):
+    ''' start the game in new processes (without a window) and return boot times (see main.run) 
+    of the run with the lowest time to first frame '''
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    reports = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', BOOT_SCRIPT], env=env).decode()
+        reports.append(json.loads(output.splitlines()[-1]))
+    return min(reports, key=lambda report: report['time_to_first_frame'])
+
+def compare(results, old_path, boot=None):
+    ''' print change in mean update and draw times against an older results file '''
+    with open(old_path) as f: old_data = json.load(f)
+    old = {(r['room'], r['difficulty'], r['entrance_dir']): r for r in old_data['results']}
+    if boot and old_data.get('boot'):
+        print(f'time to first frame: {old_data["boot"]["time_to_first_frame"]:.1f} -> {boot["time_to_first_frame"]:.1f} ms')
+    print(f'{"scenario":<20}{"update":>10}{"draw":>10}{"construct":>12}')
+    for r in results:
+        o = old.get((r['room'], r['difficulty'], r['entrance_dir']))
+        if o == None: continue
+        ratio = lambda new, old: f'{new/old:.2f}x' if old else '-'
+        print(f'R{r["room"]} d{r["difficulty"]} {r["entrance_dir"]:<13}{ratio(r["update_ms"]["mean"], o["update_ms"]["mean"]):>10}'
+            f'{ratio(r["draw_ms"]["mean"], o["draw_ms"]["mean"]):>10}{ratio(r["construct_ms"], o["construct_ms"]):>12}')
+
+def run():
+    parser = argparse.ArgumentParser(description='benchmark every room at every difficulty and entrance direction')
+    parser.add_argument('--frames', type=int, default=600, help='frames to play each scenario for')
+    parser.add_argument('--rooms', type=int, nargs='*', help='room numbers to benchmark (default: all)')
+    parser.add_argument('--no-draw', action='store_true', help="don't time drawing")
+    parser.add_argument('--out', default='bench.json', help='path to write JSON results to')
+    parser.add_argument('--compare', help='JSON results from an earlier run to compare against')
+    parser.add_argument('--no-boot', action='store_true', help="don't measure time to first frame")
+    parser.add_argument('--arrows', type=int, nargs='*', help='only time a room with these numbers of arrows in it')
+    args = parser.parse_args()
+
+    boot = None if args.no_boot or args.arrows else measure_boot()
+    if boot: print('boot (ms):', boot)
+
+    g = game_module.headless(SCREEN_SIZE)
+    import main as renderer
+    renderer.set_screen(pygame.Surface(SCREEN_SIZE).convert())
+    renderer.game = g
+
+    if args.arrows:
+        for count in args.arrows:
+            result = run_arrows(g, count, args.frames, draw=not args.no_draw)
+            print(f'{count} arrows  update {result["update_ms"]["mean"]:.3f}/{result["update_ms"]["p99"]:.3f} ms  '
+                f'draw {result["draw_ms"]["mean"]:.3f}/{result["draw_ms"]["p99"]:.3f} ms (mean/p99)')
+        return
+
+    warm_up(g, args.rooms)
+
+    results = []
+    for room_num, difficulty, entrance_dir in scenarios(args.rooms):
+        result = run_scenario(g, room_num, difficulty, entrance_dir, args.frames, draw=not args.no_draw)
+        results.append(result)
+        print(f'R{room_num} d{difficulty} {entrance_dir:<7} construct {result["construct_ms"]:7.3f} ms  '
+            f'update {result["update_ms"]["mean"]:.3f}/{result["update_ms"]["p99"]:.3f} ms  '
+            f'draw {result["draw_ms"]["mean"]:.3f}/{result["draw_ms"]["p99"]:.3f} ms (mean/p99)')
+
+    meta = {'commit': git_commit(), 'python': platform.python_version(), 'pygame': pygame.version.ver,
+        'frames': args.frames, 'screen_size': SCREEN_SIZE, 'seed': SEED, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    with open(args.out, 'w') as f: json.dump({'meta': meta, 'boot': boot, 'results': results}, f, indent=1)
+    print(f'wrote {len(results)} results to {args.out}')
+    import layouts
+    layouts.save_cache() # layouts compiled by warm_up
+    if args.compare: compare(results, args.compare, boot)
+
+if __name__ == '__main__': run()
@@ -0,0 +1,104 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' catalog of rooms that can be loaded, indexed by entrance direction.
+picking the next room takes the same time no matter how many rooms there are.
+run this file to compare against scanning every room (python catalog.py) '''
+
+import random
+import time
+
+DIRS = ['left', 'right', 'top', 'bottom']
+
+
+class RoomCatalog(object):
+    ''' rooms that can be loaded next. a room can't be loaded again until unload_all (see Game.reset).
+    data: {room number: {'enter_dirs': [...], 'exit_dirs': [...]}} (see game.ROOM_LOADING_DATA) '''
+    def __init__(self, data):
+        self.exit_dirs = {room_num: room['exit_dirs'] for room_num, room in data.items()}
+        self.enter_dirs = {room_num: room['enter_dirs'] for room_num, room in data.items()}
+        self.available = {dir: [] for dir in DIRS} # entrance direction: rooms that can be entered from it and aren't loaded
+        self.index = {dir: {} for dir in DIRS} # entrance direction: {room number: index in available[dir]}
+        self.loaded = 0 # bitset, bit n is set if room n is loaded
+        for room_num in data: self.add(room_num)
+
+    def add(self, room_num):
+        ''' make a room available from each direction it can be entered from '''
+        for dir in self.enter_dirs[room_num]:
+            self.index[dir][room_num] = len(self.available[dir])
+            self.available[dir].append(room_num)
+
+    def remove(self, room_num):
+        ''' swap a room with the last room of each list it's in, then remove it '''
+        for dir in self.enter_dirs[room_num]:
+            rooms, index = self.available[dir], self.index[dir]
+            i = index.pop(room_num)
+            last = rooms.pop()
+            if last != room_num:
+                rooms[i] = last
+                index[last] = i
+
+    def is_loaded(self, room_num):
+        return self.loaded >> room_num & 1
+
+    def load(self, room_num):
+        ''' mark a room as loaded, so it isn't chosen again '''
+        if self.is_loaded(room_num): return
+        self.loaded |= 1 << room_num
+        self.remove(room_num)
+
+    def unload_all(self):
+        ''' make every loaded room available again. takes time for the number of loaded rooms, not the size of the catalog '''
+        loaded = self.loaded
+        while loaded:
+            bit = loaded & -loaded # lowest set bit
+            self.add(bit.bit_length() -1)
+            loaded ^= bit
+        self.loaded = 0
+
+    def choose(self, entrance_dir, rng=random):
+        ''' random room that can be entered from entrance_dir and isn't loaded, or None if there aren't any '''
+        rooms = self.available[entrance_dir]
+        if not rooms: return None
+        return rng.choice(rooms)
+
+
+### SYNTHETIC CATALOGS ###
+def synthetic(n, seed=0):
+    ''' catalog data for n rooms with random entrance and exit directions, for benchmarking '''
+    rng = random.Random(seed)
+    return {room_num: {'enter_dirs': rng.sample(DIRS, rng.randint(1, 4)), 'exit_dirs': rng.sample(DIRS, rng.randint(1, 4))}
+        for room_num in range(1, n +1)}
+
+def scan_choose(data, loaded, entrance_dir, rng=random):
+    ''' Game.load_room before this module: scan every room for ones that can be entered and aren't loaded '''
+    valid_rooms = [room_num for room_num, room in data.items() if entrance_dir in room['enter_dirs'] and room_num not in loaded]
+    if not valid_rooms: return None
+    return rng.choice(valid_rooms)
+
+def benchmark(sizes=(6, 100, 1000, 10000), picks=2000):
+    ''' print time to pick a room (and mark it loaded) by scanning and with a catalog.
+    every 50 picks the player "dies" and every room becomes available again '''
+    print(f'{"rooms":>8}{"scan":>14}{"catalog":>14}{"speedup":>10}')
+    for n in sizes:
+        data = synthetic(n)
+        rng = random.Random(1)
+        loaded = set()
+        start = time.perf_counter()
+        for i in range(picks):
+            if i%50 == 0: loaded = set()
+            room_num = scan_choose(data, loaded, rng.choice(DIRS), rng)
+            if room_num != None: loaded.add(room_num)
+        scan_time = (time.perf_counter() -start)/picks*1e6
+
+        catalog = RoomCatalog(data)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for i in range(picks):
+            if i%50 == 0: catalog.unload_all()
+            room_num = catalog.choose(rng.choice(DIRS), rng)
+            if room_num != None: catalog.load(room_num)
+        catalog_time = (time.perf_counter() -start)/picks*1e6
+        print(f'{n:>8}{scan_time:>11.2f} us{catalog_time:>11.2f} us{scan_time/catalog_time:>9.1f}x')
+
+if __name__ == '__main__': benchmark()
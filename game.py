@@ -0,0 +1,256 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+import pygame
+import random
+import os
+import zlib
+import assets
+import catalog
+
+# databases
+ROOM_LOADING_DATA = {
+    1: {'enter_dirs':['left','top'], 'exit_dirs':['right']},
+    2: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
+    3: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
+    4: {'enter_dirs':['top'], 'exit_dirs':['bottom']},
+    5: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
+    6: {'enter_dirs':['left', 'bottom', 'top'], 'exit_dirs':['left', 'right', 'bottom']}
+}
+ENTRANCE_DIRS = {'left':'right', 'right':'left', 'top':'bottom', 'bottom':'top'} # exit direction: entrance direction of the next room
+MAX_PREFETCH_PER_EXIT = 8 # most rooms built ahead of time for each exit (see Game.prefetch)
+
+# movement
+MOVE_SPEED = 5 # default movement speed in pixels per frame
+
+# time
+MAX_TICKS = 5 # most ticks simulated per drawn frame. if the game falls further behind, it slows down
+
+# music
+MAX_MUSIC_NUM = 2
+MUSIC_END = pygame.USEREVENT # event posted when a loop of music ends and the queued loop starts
+
+current = None # Game being played. used by objects and rooms to get the room and player
+
+
+### HELPER FUNCTIONS ###
+def headless(screen_size=(1680, 945), **kwargs):
+    ''' create a Game without a window or audio.
+    uses SDL's dummy drivers, so it can run on a server with no display.
+    kwargs: passed to Game '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+    if pygame.display.get_surface() == None: pygame.display.set_mode((1, 1)) # images can't be converted without a display
+    return Game(screen_size, audio=False, **kwargs)
+
+
+### GAME ###
+class Inputs(object):
+    ''' keys held down during a frame.
+    can be indexed by pygame key constants, like pygame.key.get_pressed() '''
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class Game(object):
+    ''' rooms, player, and counters for a run of the game.
+    doesn't draw anything, see main.py for the window and game loop '''
+    def __init__(self, screen_size, audio=True, debug_room=0, debug_start_pos=None, room_clears=None, seed=None):
+        global current
+        current = self
+        import objects
+
+        # seed random so a run can be replayed (see replay.py)
+        self.seed = seed if seed != None else random.randrange(2**32)
+        random.seed(self.seed)
+
+        # sizing
+        self.screen_width, self.screen_height = screen_size
+        self.def_room_w, self.def_room_h = self.screen_height*9//10, self.screen_height*9//10
+
+        self.audio = audio # whether music and sound effects play
+        if audio: pygame.mixer.music.set_endevent(MUSIC_END)
+        self.debug_room = debug_room # room to start in, 0 for random starting rooms
+        self.debug_start_pos = debug_start_pos # str evaluated to get starting position of player, see main.DEBUG_START_POS
+
+        # time
+        self.seconds = 0
+        self.frames = 0 # ticks simulated
+        self.time_scale = 1 # game speed (1 for real time). multiplied by the room's time_scale
+        self.accumulator = 0 # ticks of time passed that haven't been simulated yet (see ticks)
+
+        # counters
+        self.deaths = -1
+        self.num_rooms_cleared = 0
+        self.player = objects.Player(0, 0)
+
+        # room info
+        self.room = None
+        self.room_to_clears = room_clears if room_clears != None else {}
+        self.room_to_deaths = {}
+        self.catalog = catalog.RoomCatalog(ROOM_LOADING_DATA) # rooms that haven't been loaded since dying
+        self.start_rooms = {1,2}
+        self.prefetched = {} # (room number, entrance direction): room built ahead of time by prefetch
+
+        self.reset()
+        self.start_rooms.add(3)
+
+    def ticks(self, dt):
+        ''' number of ticks to simulate for dt seconds of real time.
+        the simulation always moves in ticks of 1/objects.FPS seconds, so it runs the same at any frame rate.
+        time left over is kept for the next call (see alpha) '''
+        import objects
+        self.accumulator += dt*objects.FPS*self.time_scale*self.room.time_scale
+        ticks = int(self.accumulator)
+        self.accumulator -= ticks
+        return min(ticks, MAX_TICKS)
+
+    @property
+    def alpha(self):
+        ''' how far (0 to 1) the next tick is from being simulated. 
+        used to draw objects between their last two positions '''
+        return self.accumulator
+
+    def step(self, inputs):
+        ''' simulate one tick (1/objects.FPS seconds).
+        inputs: keys held down, indexable by pygame key constants (Inputs or pygame.key.get_pressed()) '''
+        import objects
+        self.frames += 1
+        self.seconds += 1/objects.FPS
+        room = self.room
+        self.player.prev_pos = self.player.rect.topleft
+        for obj in room.dynamic_objs: obj.prev_pos = obj.rect.topleft
+        self.player.pressed = inputs
+        self.room.update(self.player)
+        self.player.update_attack()
+        if self.room is not room: self.player.prev_pos = None # player moved to a new room
+
+    def fast_forward(self, inputs, seconds):
+        ''' simulate seconds of game time as fast as possible, holding down the same keys (for headless runs) '''
+        import objects
+        for _ in range(round(seconds*objects.FPS)): self.step(inputs)
+
+    def state_hash(self):
+        ''' checksum of the player, room, and counters. 
+        used by replay.py to check that a replay plays the same as the recording '''
+        player, room = self.player, self.room
+        state = (self.frames, self.deaths, self.num_rooms_cleared, room.room_num, room.age, 
+            tuple(player.rect), player.color, player.y_vel, player.dash_timer, player.attack, len(player.keys),
+            [(type(obj).__name__, tuple(obj.rect)) for obj in room.objs], zlib.crc32(room.arrows.pos[:room.arrows.count].tobytes()))
+        return zlib.crc32(repr(state).encode())
+
+    def build_room(self, room_num, entrance_dir=0, cleared=None):
+        ''' returns a new room, not entered yet (see Room.enter).
+        random is seeded from the game's seed and progress while the room is built, 
+        so a room is the same whether it's built by prefetch or by load_room, and building doesn't change the game's random numbers.
+        cleared: number of rooms cleared when the room is entered (defaults to now) '''
+        import rooms
+        if cleared == None: cleared = self.num_rooms_cleared
+        state = random.getstate()
+        random.seed(f'{self.seed}-{self.deaths}-{cleared}-{room_num}-{entrance_dir}')
+        try: return rooms.build(room_num, self.room_to_clears.get(room_num, 0), entrance_dir)
+        finally: random.setstate(state)
+
+    def prefetch_candidates(self):
+        ''' (room number, entrance direction) of rooms load_room could load from the current room, in the order they're prefetched.
+        with a big catalog only some of the rooms behind each exit are prefetched '''
+        candidates = []
+        for exit_dir in self.catalog.exit_dirs[self.room.room_num]:
+            entrance_dir = ENTRANCE_DIRS[exit_dir]
+            candidates += [(room_num, entrance_dir) for room_num in self.catalog.available[entrance_dir][:MAX_PREFETCH_PER_EXIT]]
+        return candidates
+
+    def prefetch(self):
+        ''' build the next room the player could go to, so load_room doesn't have to.
+        called by the game loop with time left in a frame. builds at most one room per call
+        returns whether a room was built '''
+        for room_num, entrance_dir in self.prefetch_candidates():
+            if (room_num, entrance_dir) in self.prefetched: continue
+            self.prefetched[(room_num, entrance_dir)] = self.build_room(room_num, entrance_dir, cleared=self.num_rooms_cleared +1)
+            return True
+        return False
+
+    def reset(self):
+        ''' starts/resets the game '''
+        self.num_rooms_cleared = 0
+        self.deaths += 1
+        if self.room != None:
+            self.room_to_deaths[self.room.room_num] += 1
+
+        self.player.keys = [] # reset player keys
+        self.player.set_color('def') # reset player powerup
+
+        if self.debug_room: room_num = self.debug_room
+
+        # load random starting room
+        else: room_num = random.choice(sorted(self.start_rooms)) # get random starting room
+        if room_num not in self.room_to_clears.keys(): self.room_to_clears[room_num] = 0
+        if room_num not in self.room_to_deaths.keys(): self.room_to_deaths[room_num] = 0
+        self.room = self.build_room(room_num)
+        self.room.enter(self.player)
+        self.catalog.unload_all()
+        self.catalog.load(room_num)
+        self.prefetched = {} # built for a different number of deaths and rooms cleared
+
+        # set player position
+        self.player.rect.center = self.room.rect.center
+        if self.debug_start_pos:
+            self.player.rect.right, self.player.rect.top = eval(self.debug_start_pos, {'room': self.room, 'player': self.player})
+
+        # start music
+        if self.audio and not pygame.mixer.music.get_busy():
+            pygame.mixer.music.load(assets.music_file(self.num_rooms_cleared), 'mp3')
+            pygame.mixer.music.play()
+        self.queue_music()
+
+    def load_room(self, exit_door):
+        ''' load a new, random room '''
+        import objects
+        self.num_rooms_cleared += 1
+        self.room_to_clears[self.room.room_num] += 1
+
+        # only load rooms if entrance direction is valid
+        entrance_dir = ENTRANCE_DIRS[exit_door.dir]
+
+        # load random room (only load rooms which haven't been loaded since dying)
+        room_num = self.catalog.choose(entrance_dir)
+
+        # start over if every room has been cleared
+        if room_num == None:
+            self.reset()
+            return
+        if room_num not in self.room_to_clears.keys(): self.room_to_clears[room_num] = 0
+        if room_num not in self.room_to_deaths.keys(): self.room_to_deaths[room_num] = 0
+        room = self.prefetched.get((room_num, entrance_dir))
+        if room == None: room = self.build_room(room_num, entrance_dir) # not prefetched yet
+        self.room = room
+        self.room.enter(self.player)
+        self.catalog.load(room_num)
+        self.prefetched = {} # built for the last room's exits
+
+        # play door lock sound
+        objects.play_sound('lock')
+        self.queue_music()
+
+        # set spawn location
+        player = self.player
+        if exit_door.dir in ['right','left']:
+            if exit_door.dir == 'right': # enter on left
+                player.rect.left = self.room.rect.left
+            else:  # enter on right
+                player.rect.right = self.room.rect.right
+        else:
+            if exit_door.dir == 'top': # enter from top
+                player.rect.bottom = self.room.rect.bottom
+            else: # enter from bottom
+                player.rect.top = self.room.rect.top
+
+    def queue_music(self):
+        ''' queue next loop of music. 
+        called when the number of rooms cleared changes, and by the game loop when a loop ends (MUSIC_END) '''
+        if not self.audio: return
+        pygame.mixer.music.queue(assets.music_file(min(self.num_rooms_cleared, MAX_MUSIC_NUM)), 'mp3')
@@ -0,0 +1,274 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' room layouts: what's in each room, stored as data in layouts/R<room number>.json instead of code.
+positions and sizes are expressions relative to the room (left, right, top, bottom, centerx, centery, width, height),
+which are compiled into a flat list of objects for a given difficulty, entrance direction, and screen size.
+compiled layouts are cached in memory and on disk (CACHE_PATH, written when the game quits), so building a room only creates its objects.
+
+layout file format:
+    size: [width, height] of room. may use def_w and def_h (default room size)
+    vars: {name: expression} usable by later vars and objects, in order
+    objects: list of objects, in the order they're added to the room. each one is either
+        {type: class in objects.py, args: [expressions]}
+        {type: 'doors', open: exit doors start open, lock: [directions of doors to lock]} for doors and borders
+        {objects: [objects]} a group of objects
+    any object or group can have if (expression, skipped if false) and repeat (times to add it, numbered by i)
+    expressions can also use difficulty, spike_w, spike_h, key_w, key_h, and int(). text is quoted inside the expression, like "'red'"
+    note: ignored, for describing a room or object
+run this file to check that every exit of every layout can be reached and that occupancy grids match their objects (python layouts.py) '''
+
+import ast
+import json
+import operator
+import os
+import zlib
+
+import numpy as np
+import pygame
+
+LAYOUT_DIR = 'layouts'
+CACHE_PATH = 'layouts.cache' # generated, not committed
+MAX_DIFFICULTY = 3 # layouts are the same for every difficulty from this one up, so they share a cache entry
+CACHE_VERSION = 1 # change when compiled layouts change without any layout file changing (e.g. the compiler), so old caches are rejected
+
+# operations allowed in expressions
+OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.USub: operator.neg, ast.UAdd: operator.pos,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+FUNCTIONS = {'int': int}
+
+compiled = None # {cache key: compiled layout}, loaded from CACHE_PATH by get
+unsaved = False # whether layouts were compiled since the cache file was loaded or saved
+
+
+### EXPRESSIONS ###
+def evaluate(expr, names):
+    ''' value of an expression from a layout file. numbers and lists are returned as they are '''
+    if type(expr) == list: return [evaluate(item, names) for item in expr]
+    if type(expr) != str: return expr
+    return evaluate_node(ast.parse(expr, mode='eval').body, names)
+
+def evaluate_node(node, names):
+    if type(node) == ast.Constant: return node.value
+    if type(node) == ast.Name: return names[node.id]
+    if type(node) == ast.BinOp: return OPERATORS[type(node.op)](evaluate_node(node.left, names), evaluate_node(node.right, names))
+    if type(node) == ast.UnaryOp: return OPERATORS[type(node.op)](evaluate_node(node.operand, names))
+    if type(node) == ast.Compare and len(node.ops) == 1:
+        return OPERATORS[type(node.ops[0])](evaluate_node(node.left, names), evaluate_node(node.comparators[0], names))
+    if type(node) == ast.BoolOp:
+        values = [evaluate_node(value, names) for value in node.values]
+        return all(values) if type(node.op) == ast.And else any(values)
+    if type(node) == ast.Call and node.func.id in FUNCTIONS: return FUNCTIONS[node.func.id](*[evaluate_node(arg, names) for arg in node.args])
+    raise ValueError(f'not allowed in layout expressions: {ast.dump(node)}')
+
+
+### COMPILING ###
+def compile_layout(room_num, difficulty, entrance_dir, screen_size):
+    ''' resolve a layout file into {'size': [w, h], 'rect': room Rect, 'objects': [[class name, args, door state]]} '''
+    with open(os.path.join(LAYOUT_DIR, f'R{room_num}.json')) as f: layout = json.load(f)
+    screen_w, screen_h = screen_size
+    def_size = screen_h*9//10 # default room width and height (same as Game.def_room_w and def_room_h)
+    width, height = evaluate(layout['size'], {'def_w': def_size, 'def_h': def_size})
+    rect = pygame.Rect(screen_w/2 -width/2, screen_h/2 -height/2, width, height)
+    sizes = object_sizes()
+    spike_w, spike_h = sizes['spike']
+    key_w, key_h = sizes['key']
+    names = {'left': rect.left, 'right': rect.right, 'top': rect.top, 'bottom': rect.bottom, 'centerx': rect.centerx, 'centery': rect.centery,
+        'width': width, 'height': height, 'difficulty': difficulty, 'spike_w': spike_w, 'spike_h': spike_h, 'key_w': key_w, 'key_h': key_h}
+    for name, expr in layout.get('vars', {}).items(): names[name] = evaluate(expr, names)
+
+    entries = []
+    def add(items, names):
+        for item in items:
+            for i in range(evaluate(item.get('repeat', 1), names)):
+                item_names = dict(names, i=i) if 'repeat' in item else names
+                if not evaluate(item.get('if', True), item_names): continue
+                if 'objects' in item: add(item['objects'], item_names)
+                elif item['type'] == 'doors': entries.extend(doors_and_borders(room_num, rect, entrance_dir, item.get('open', True), item.get('lock', [])))
+                else: entries.append(entry(item, item_names))
+    add(layout['objects'], names)
+    return {'size': [width, height], 'rect': list(rect), 'objects': entries}
+
+def entry(item, names):
+    ''' [class name, args, door state] for an object '''
+    args = evaluate(item.get('args', []), names)
+    if 'contents' in item: args.append(entry(item['contents'], names))
+    return [item['type'], args, None]
+
+def doors_and_borders(room_num, rect, entrance_dir, open, lock):
+    ''' doors in the middle of each wall the room can be exited from (and the one it was entered from), and walls around them.
+    maximum of 1 door per wall '''
+    from game import ROOM_LOADING_DATA
+    door_w, door_h = object_sizes()['door']
+    thickness = door_w//2
+    doors = {} # dir: door state
+    for dir in ROOM_LOADING_DATA[room_num]['exit_dirs']:
+        if dir != entrance_dir: doors[dir] = 'open' if open else 'locked'
+    if entrance_dir: doors[entrance_dir] = 'def'
+    entries, borders = [], []
+    for dir, state in doors.items():
+        if dir in lock: state = 'locked'
+        door = pygame.Rect(0, 0, door_w, door_h) if dir in ['left', 'right'] else pygame.Rect(0, 0, door_h, door_w)
+        door.x, door.y = rect.centerx -door.width/2, rect.centery -door.height/2
+        if dir == 'right': door.left = rect.right
+        elif dir == 'left': door.right = rect.left
+        elif dir == 'top': door.bottom = rect.top
+        else: door.top = rect.bottom
+        entries.append(['Door', [door.x, door.y, dir], None if state == 'locked' else state])
+
+        # walls on either side of the door
+        if dir in ['top', 'bottom']:
+            y = rect.top -thickness if dir == 'top' else rect.bottom
+            borders.append(['Plaform', [rect.left, y, door.left -rect.left, thickness], None])
+            borders.append(['Plaform', [door.right, y, rect.right -door.right, thickness], None])
+        else:
+            x = rect.right if dir == 'right' else rect.left -thickness
+            borders.append(['Plaform', [x, rect.top, thickness, door.top -rect.top], None])
+            borders.append(['Plaform', [x, door.bottom, thickness, rect.bottom -door.bottom], None])
+
+    # walls without doors
+    for dir in ['right', 'left', 'top', 'bottom']:
+        if dir in doors: continue
+        if dir == 'right': borders.append(['Plaform', [rect.right, rect.top, thickness, rect.height], None])
+        elif dir == 'left': borders.append(['Plaform', [rect.left -thickness, rect.top, thickness, rect.height], None])
+        elif dir == 'top': borders.append(['Plaform', [rect.left, rect.top -thickness, rect.width, thickness], None])
+        else: borders.append(['Plaform', [rect.left, rect.bottom, rect.width, thickness], None])
+    return entries +borders
+
+
+### CACHE ###
+def object_sizes():
+    ''' sizes of objects that layouts depend on '''
+    import objects
+    return {'spike': list(objects.load_image('spike').get_size()), 'key': list(objects.ANIMATION_DATA['key-sheet'][:2]), 
+        'door': list(objects.ANIMATION_DATA['door-sheet'][:2])}
+
+def sources():
+    ''' {file name: [modified time, file size]} for every layout file '''
+    found = {}
+    for filename in sorted(os.listdir(LAYOUT_DIR)):
+        if not filename.endswith('.json'): continue
+        stat = os.stat(os.path.join(LAYOUT_DIR, filename))
+        found[filename] = [stat.st_mtime_ns, stat.st_size]
+    return found
+
+def loading_data():
+    ''' hash of game.ROOM_LOADING_DATA, which decides where doors and borders go (see doors_and_borders) '''
+    from game import ROOM_LOADING_DATA
+    return zlib.crc32(repr(sorted(ROOM_LOADING_DATA.items())).encode())
+
+def header():
+    ''' everything compiled layouts depend on besides room, difficulty, entrance direction, and screen size (the cache key).
+    the cache is rebuilt if any of it changes '''
+    return {'version': CACHE_VERSION, 'sources': sources(), 'sizes': object_sizes(), 'loading_data': loading_data()}
+
+def load_cache(path=CACHE_PATH):
+    ''' returns compiled layouts from the cache file, or {} if it doesn't exist or its header is different (see header) '''
+    try:
+        with open(path) as f: cache = json.load(f)
+    except (OSError, ValueError): return {}
+    if cache.get('header') != header(): return {}
+    return cache['layouts']
+
+def save_cache(path=CACHE_PATH):
+    ''' write compiled layouts to the cache file if any were compiled since it was loaded.
+    writing takes longer than a frame, so it's only done when the game quits (see main.quit), not by get '''
+    global unsaved
+    if not unsaved: return
+    with open(path +'.tmp', 'w') as f: json.dump({'header': header(), 'layouts': compiled}, f)
+    os.replace(path +'.tmp', path) # so a half written cache is never read
+    unsaved = False
+
+def get(room_num, difficulty, entrance_dir, screen_size):
+    ''' compiled layout of a room, compiling and caching it the first time it's needed '''
+    global compiled, unsaved
+    if compiled == None: compiled = load_cache()
+    difficulty = min(difficulty, MAX_DIFFICULTY)
+    key = f'R{room_num}-{difficulty}-{entrance_dir}-{screen_size[0]}x{screen_size[1]}'
+    if key not in compiled:
+        compiled[key] = compile_layout(room_num, difficulty, entrance_dir, screen_size)
+        unsaved = True # kept in memory until save_cache
+    return compiled[key]
+
+def instantiate(entry):
+    ''' create the object for an entry of a compiled layout '''
+    import objects
+    name, args, state = entry
+    obj = getattr(objects, name)(*[instantiate(arg) if type(arg) == list else arg for arg in args])
+    if state != None: obj.set_animation_state(state)
+    return obj
+
+
+### CHECKING ###
+def reachable_exits(room, player_size):
+    ''' directions of the exit doors a player of player_size (width, height) could walk to in a built room, from where it enters.
+    uses the room's occupancy grid (see spatial.OccupancyGrid). gravity and keys are ignored and every door counts as open, 
+    so this only finds exits that are walled off '''
+    import objects
+    import spatial
+    grid = room.grid
+    doors = [obj for obj in room.objs if type(obj) == objects.Door]
+    inside = np.zeros_like(grid.cells, bool) # inside the room or a doorway, so the player can't walk around the outside
+    for rect in [room.rect] +[door.rect for door in doors]: inside[grid.cell_range(rect)] = True
+    blocked = grid.layer(spatial.SOLID | spatial.DEADLY) | ~inside
+    for door in doors: blocked[grid.cell_range(door.rect)] = False
+
+    # where the player enters (see Game.reset and Game.load_room)
+    start = pygame.Rect((0, 0), player_size)
+    start.center = room.rect.center
+    for door in doors:
+        if door.dir != room.entrance_dir: continue
+        start.center = door.rect.center
+        if door.dir == 'left': start.left = room.rect.left
+        elif door.dir == 'right': start.right = room.rect.right
+        elif door.dir == 'top': start.top = room.rect.top
+        else: start.bottom = room.rect.bottom
+    w, h = -(-player_size[0]//grid.cell_size), -(-player_size[1]//grid.cell_size) # in cells
+    reached = grid.reachable(grid.cell(*start.topleft), (w, h), blocked)
+
+    # cells the player covers at every position it reached
+    covered = reached.copy()
+    for dy in range(h):
+        for dx in range(w): covered[dy:, dx:] |= reached[:grid.rows -dy, :grid.cols -dx]
+    return [door.dir for door in doors if door.dir != room.entrance_dir and covered[grid.cell_range(door.rect)].any()]
+
+def grid_problems(room):
+    ''' descriptions of objects that don't move (and every crumble platform, which should be SOLID and BREAKABLE) whose layers are missing from the room's occupancy grid, 
+    and of any BREAKABLE cells left after every crumble platform is removed '''
+    import spatial
+    missing = [f'{type(obj).__name__} at {tuple(obj.rect)}' for obj in room.objs if (not obj.moves or obj.crumbles) and spatial.layers(obj) & ~room.grid.area(obj.rect)]
+    for obj in [obj for obj in room.objs if obj.crumbles]: room.remove_obj(obj)
+    left = room.grid.layer(spatial.BREAKABLE)
+    for obj in room.objs:
+        if obj.breakable: left[room.grid.cell_range(obj.rect)] = False
+    return missing +([f'{left.sum()} breakable cells after crumbling'] if left.any() else [])
+
+def check():
+    ''' print every room, difficulty, and entrance direction with an exit that can't be reached, or an occupancy grid that doesn't match its objects '''
+    import game as game_module
+    import rooms
+    g = game_module.headless()
+    player_size = g.player.rect.size
+    problems = 0
+    for room_num, data in game_module.ROOM_LOADING_DATA.items():
+        entrances = list(data['enter_dirs']) +([0] if room_num in g.start_rooms else [])
+        for difficulty in range(MAX_DIFFICULTY +1):
+            for entrance_dir in entrances:
+                room = rooms.build(room_num, difficulty, entrance_dir)
+                exits = [dir for dir in data['exit_dirs'] if dir != entrance_dir]
+                reached = reachable_exits(room, player_size)
+                blocked = [dir for dir in exits if dir not in reached]
+                if blocked: 
+                    problems += 1
+                    print(f'R{room_num} d{difficulty} entering {entrance_dir or "at start"}: can\'t reach {", ".join(blocked)}')
+                wrong = grid_problems(room)
+                if wrong:
+                    problems += 1
+                    print(f'R{room_num} d{difficulty} entering {entrance_dir or "at start"}: occupancy grid is missing {", ".join(wrong)}')
+    print(f'{problems} problems with layouts')
+    save_cache()
+
+if __name__ == '__main__': 
+    import layouts # rooms use the imported module, not __main__, so its cache is the one to save
+    layouts.check()
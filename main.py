@@ -2,9 +2,13 @@
 # Created: 2/20/23
 
 ### IMPORTS ###
+import time
+BOOT_START = time.perf_counter() # for time to first frame
 import pygame
 import sys
-import random
+import text as text_cache
+import profiler
+import assets
 
 
 ### GLOBAL VARIABLES ###
@@ -12,46 +16,37 @@ import random
 DEBUG = True
 DEBUG_GRID = False
 DEBUG_HITBOXES = False
+DEBUG_ARROWS = False # show arrows in the room and the most there have been at once
+DEBUG_TEXT_CACHE = False # show text cache hits and misses
+DEBUG_PROFILER = False # show mean/p99 time of each phase of the game loop. toggle with p
 DEBUG_ROOM = 1 # 0 to set to default
 DEBUG_START_POS = '(room.rect.centerx +player.width//2, room.rect.centery -player.height//2)'
 DEBUG_ROOM_CLEARS = {}
 
 # time
-pygame.init()
 clock = pygame.time.Clock()
-
-# databases
-ROOM_LOADING_DATA = {
-    1: {'enter_dirs':['left','top'], 'exit_dirs':['right']},
-    2: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
-    3: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
-    4: {'enter_dirs':['top'], 'exit_dirs':['bottom']},
-    5: {'enter_dirs':['left','right','top','bottom'], 'exit_dirs':['left','right','top','bottom']},
-    6: {'enter_dirs':['left', 'bottom', 'top'], 'exit_dirs':['left', 'right', 'bottom']}
-}
+TIME_SCALE = 1 # game speed (1 for real time, 2 for double speed, etc.)
 
 # window
 FULLSCREEN = True
 ASPECT_RATIO = 9/16
-screen_info = pygame.display.Info()
-window_size = (screen_info.current_w*7//8, round(screen_info.current_w*ASPECT_RATIO*7//8)) # 16:9 aspect ratio
-SCREEN_WIDTH, SCREEN_HEIGHT = window_size[0], window_size[1]
-screen = pygame.display.set_mode(window_size, flags=pygame.SCALED, vsync=1)
-pygame.display.set_caption('rooms') 
-if FULLSCREEN: pygame.display.toggle_fullscreen()
 
-# scripts
-import objects
-import rooms # don't delete! used by load_room and reset
+# rendering
+DIRTY_RECTS = False # only redraw and update parts of the screen that changed. toggle with r
+DEBUG_RENDER_TIME = False # show average time to draw and update the screen, to compare rendering modes
 
-# sizing
-DEF_ROOM_W, DEF_ROOM_H = SCREEN_HEIGHT*9//10, SCREEN_HEIGHT*9//10
+# loading
+PREFETCH = True # build the rooms the player could go to next with time left over each frame (see Game.prefetch)
+PREFETCH_BUDGET = .5 # fraction of a frame that updating, drawing, and prefetching can use before prefetching stops for that frame
+PREFETCH_BAKED = 3 # most prefetched rooms with a baked background (each is a screen sized Surface)
 
-# movement
-MOVE_SPEED = 5 # default movement speed in pixels per frame
+# profiling
+DEBUG_BOOT = True # print time taken by each step of starting the game
+PROFILE = False # time each phase of the game loop every frame (also turned on by the profiler overlay)
+PROFILE_CSV = None # file to write times for every frame to while playing, e.g. 'profile.csv' (None to not write them)
 
-# music 
-MAX_MUSIC_NUM = 2
+# recording
+RECORD_FILE = None # record seed and keys pressed every frame to this file, for replay.py (None to not record)
 
 # colors 
 C_WALLS = (0, 0, 0)
@@ -61,88 +56,59 @@ C_DEBUG_GRID = (70, 70, 70)
 C_DEBUG_TEXT = (100,100,100)
 C_DEBUG_HITBOX = (255,0,0)
 
-# fonts
-F_ROOM_NUM = pygame.font.Font('font/room_num_font.ttf', 200)
-F_CLEARS_DEATHS = pygame.font.Font(None, 24)
+# fonts, set by load_fonts
+F_ROOM_NUM = None
+F_CLEARS_DEATHS = None
+F_DEBUG_GRID = None
+F_DEBUG_TEXT = None
 
 
 ### HELPER FUNTIONS ###
 def quit():
     ''' quit game '''
+    profiler.frame_profiler.close_csv()
+    if recorder != None: recorder.close()
+    import layouts
+    layouts.save_cache() # layouts compiled while playing
     pygame.quit()
     sys.exit()
 
-def reset():
-    ''' starts/resets the game '''
-    global room, deaths, num_rooms_cleared, rooms_loaded, room_to_clears
-    num_rooms_cleared = 0
-    deaths += 1
-    if room != None: room_to_deaths[room.room_num] += 1
-
-    player.keys = [] # reset player keys
-    player.set_color('def') # reset player powerup
-
-    if DEBUG and DEBUG_ROOM: room_num = DEBUG_ROOM
-
-    # load random starting room 
-    else: room_num = random.sample(start_rooms,1)[0] # get random starting room
-    if room_num not in room_to_clears.keys(): room_to_clears[room_num] = 0
-    if room_num not in room_to_deaths.keys(): room_to_deaths[room_num] = 0
-    room = eval(f'rooms.R{room_num}(room_to_clears[{room_num}])')
-    rooms_loaded = set([room_num])
-
-    # set player position
-    player.rect.center = room.rect.center
-    if DEBUG: player.rect.right, player.rect.top = eval(DEBUG_START_POS)
-
-    # start music
-    if not pygame.mixer.music.get_busy():
-        pygame.mixer.music.load(f'music/{num_rooms_cleared}.mp3')   
-        pygame.mixer.music.play() 
-    else: pygame.mixer.music.queue(f'music/{num_rooms_cleared}.mp3')
-
-def load_room(exit_door):
-    ''' load a new, random room '''
-    global room, player, num_rooms_cleared, rooms_loaded, room_to_clears
-    num_rooms_cleared += 1 
-    room_to_clears[room.room_num] += 1
-    
-    # only load rooms if entrance direction is valid 
-    if exit_door.dir == 'left': entrance_dir = 'right'
-    if exit_door.dir == 'right': entrance_dir = 'left'
-    if exit_door.dir == 'top': entrance_dir = 'bottom'
-    if exit_door.dir == 'bottom': entrance_dir = 'top'
-
-    #  get valid rooms (only load rooms which haven't been loaded since dying)
-    valid_rooms = [room_num for room_num, data in ROOM_LOADING_DATA.items()\
-        if entrance_dir in data['enter_dirs'] and room_num not in rooms_loaded]
-
-    # start over if every room has been cleared
-    if not len(valid_rooms): 
-        reset() 
-        return
-    
-    # load random room
-    room_num = random.sample(valid_rooms,1)[0]
-    if room_num not in room_to_clears.keys(): room_to_clears[room_num] = 0
-    if room_num not in room_to_deaths.keys(): room_to_deaths[room_num] = 0
-    room = eval(f'rooms.R{room_num}(room_to_clears[{room_num}], entrance_dir=entrance_dir)')
-    rooms_loaded.add(room_num)
-
-    # play door lock sound
-    objects.play_sound('lock')
-
-    # set spawn location
-    if exit_door.dir in ['right','left']:
-        if exit_door.dir == 'right': # enter on left
-            player.rect.left = room.rect.left
-        else:  # enter on right
-            player.rect.right = room.rect.right
-    else:
-        if exit_door.dir == 'top': # enter from top
-            player.rect.bottom = room.rect.bottom
-        else: # enter from bottom
-            player.rect.top = room.rect.top
+def create_window():
+    ''' open game window. 
+    must be called before objects is imported (images can't be loaded without a display) '''
+    global screen, SCREEN_WIDTH, SCREEN_HEIGHT
+    screen_info = pygame.display.Info()
+    window_size = (screen_info.current_w*7//8, round(screen_info.current_w*ASPECT_RATIO*7//8)) # 16:9 aspect ratio
+    SCREEN_WIDTH, SCREEN_HEIGHT = window_size[0], window_size[1]
+    screen = pygame.display.set_mode(window_size, flags=pygame.SCALED, vsync=1)
+    pygame.display.set_caption('rooms') 
+    if FULLSCREEN: pygame.display.toggle_fullscreen()
+    screen.fill(C_WALLS) # show window right away, before anything is loaded
+    pygame.display.flip()
+
+def load_fonts():
+    global F_ROOM_NUM, F_CLEARS_DEATHS, F_DEBUG_GRID, F_DEBUG_TEXT
+    F_ROOM_NUM = pygame.font.Font('font/room_num_font.ttf', 200)
+    F_CLEARS_DEATHS = pygame.font.Font(None, 24)
+    F_DEBUG_GRID = pygame.font.Font(None, 20)
+    F_DEBUG_TEXT = pygame.font.Font(None, 24)
+
+def draw_loading(done, total):
+    ''' draw loading bar while assets load (see assets.Preloader) '''
+    screen.fill(C_WALLS)
+    bar = pygame.Rect(0, 0, SCREEN_WIDTH//3, 10)
+    bar.center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2)
+    pygame.draw.rect(screen, C_FLOORS, bar)
+    pygame.draw.rect(screen, C_ROOM_NUM, (bar.left, bar.top, bar.width*done//total, bar.height))
+    pygame.display.flip()
+    pygame.event.pump() # keep window responsive
+
+def set_screen(surface):
+    ''' draw to a given Surface instead of the window (for drawing without opening a window) '''
+    global screen, SCREEN_WIDTH, SCREEN_HEIGHT
+    screen = surface
+    SCREEN_WIDTH, SCREEN_HEIGHT = surface.get_size()
+    if F_ROOM_NUM == None: load_fonts()
 
 def draw_debug():
     #coordinate grid
@@ -150,80 +116,247 @@ def draw_debug():
         for x in range(SCREEN_WIDTH):
             if x%50 == 0:
                 pygame.draw.line(screen,C_DEBUG_GRID,(x,0),(x,SCREEN_HEIGHT))
-                text = pygame.font.Font(None, 20).render(str(x), True, C_DEBUG_GRID)
+                text = text_cache.render(F_DEBUG_GRID, str(x), C_DEBUG_GRID)
                 screen.blit(text, (x,SCREEN_HEIGHT-15))
         for y in range(SCREEN_HEIGHT):
             if y%50 == 0:
                 pygame.draw.line(screen,C_DEBUG_GRID,(0,y),(SCREEN_WIDTH,y))
-                text = pygame.font.Font(None, 20).render(str(y), True, C_DEBUG_GRID)
+                text = text_cache.render(F_DEBUG_GRID, str(y), C_DEBUG_GRID)
                 screen.blit(text, (15,y))
 
     # hitboxes
     if DEBUG_HITBOXES:
-        for obj in room.objs:
-            pygame.draw.line(screen,C_DEBUG_HITBOX,(obj.rect.left, obj.rect.top), (obj.rect.right, obj.rect.top))
-            pygame.draw.line(screen,C_DEBUG_HITBOX,(obj.rect.left, obj.rect.bottom), (obj.rect.right, obj.rect.bottom))
-            pygame.draw.line(screen,C_DEBUG_HITBOX,(obj.rect.left, obj.rect.top), (obj.rect.left, obj.rect.bottom))
-            pygame.draw.line(screen,C_DEBUG_HITBOX,(obj.rect.right, obj.rect.top), (obj.rect.right, obj.rect.bottom))
+        for rect in [obj.rect for obj in game.room.objs] +game.room.arrows.rects():
+            pygame.draw.line(screen,C_DEBUG_HITBOX,(rect.left, rect.top), (rect.right, rect.top))
+            pygame.draw.line(screen,C_DEBUG_HITBOX,(rect.left, rect.bottom), (rect.right, rect.bottom))
+            pygame.draw.line(screen,C_DEBUG_HITBOX,(rect.left, rect.top), (rect.left, rect.bottom))
+            pygame.draw.line(screen,C_DEBUG_HITBOX,(rect.right, rect.top), (rect.right, rect.bottom))
+
+    # arrows
+    if DEBUG_ARROWS:
+        arrows = game.room.arrows
+        text = text_cache.render(F_DEBUG_TEXT, f'arrows: {arrows.count} (max {arrows.high_water})', C_DEBUG_TEXT)
+        screen.blit(text, (60,10))
+
+    # text cache
+    if DEBUG_TEXT_CACHE:
+        text = text_cache.render(F_DEBUG_TEXT, f'text cache: {text_cache.cache.hits} hits, {text_cache.cache.misses} misses', C_DEBUG_TEXT)
+        screen.blit(text, (60,50))
+
+    # frame profiler
+    if DEBUG_PROFILER: draw_profiler()
 
     # text
-    # text = pygame.font.Font(None, 24).render(f'time: {round(seconds,1)}', True, C_DEBUG_TEXT)
+    # text = text_cache.render(F_DEBUG_TEXT, f'time: {round(game.seconds,1)}', C_DEBUG_TEXT)
     # screen.blit(text, (60,10))
-    # text = pygame.font.Font(None, 24).render(f'deaths: {deaths}', True, C_DEBUG_TEXT)
+    # text = text_cache.render(F_DEBUG_TEXT, f'deaths: {game.deaths}', C_DEBUG_TEXT)
     # screen.blit(text, (60,30))
 
-def draw_world():
-    screen.fill(C_WALLS) # draw walls
-    screen.fill(C_FLOORS, rect=pygame.Rect(room.rect.left -2, room.rect.top -2, room.width +4, room.height +4)) # draw floor
-    text = F_ROOM_NUM.render(str(num_rooms_cleared+1), True, C_ROOM_NUM)
+def draw_profiler():
+    ''' draw mean/p99 time of each phase of the game loop over recent frames '''
+    global profiler_lines
+    prof = profiler.frame_profiler
+    if not prof.enabled: return
+    if prof.frame_num%15 == 0 or not profiler_lines: # only update text a few times a second
+        profiler_lines = [f'{name}: {mean:.2f}/{p99:.2f} ms' for name in profiler.PHASES+['work'] for mean, p99 in [prof.stats(name)]]
+        profiler_lines.append(f'hitches: {prof.recent_hitches()} recent, {prof.hitches} total')
+    for i, line in enumerate(['frame time (mean/p99)']+profiler_lines):
+        screen.blit(text_cache.render(F_DEBUG_TEXT, line, C_DEBUG_TEXT), (60, 90 +i*20))
+
+def bake_background(room, room_count=None):
+    ''' draw walls, floor, room number, and objects that never change (see Object.baked) onto a Surface.
+    the room clears its background when baked objects are added or removed.
+    room_count: number drawn on the floor (defaults to the current room's) '''
+    if room_count == None: room_count = game.num_rooms_cleared+1
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(C_WALLS) # draw walls
+    background.fill(C_FLOORS, rect=pygame.Rect(room.rect.left -2, room.rect.top -2, room.width +4, room.height +4)) # draw floor
+    text = text_cache.render(F_ROOM_NUM, str(room_count), C_ROOM_NUM)
     w, h = text.get_size()
-    screen.blit(text, (SCREEN_WIDTH/2 -w/2, SCREEN_HEIGHT/2 -h/2))
-
-    for obj in room.objs: obj.draw(screen)
-    if DEBUG: draw_debug() # draw debug HUD
-    player.draw(screen)
-
-    # draw text for room clears
-    text = F_CLEARS_DEATHS.render('clears: '+str(room_to_clears[room.room_num]), True, C_ROOM_NUM)
+    background.blit(text, (SCREEN_WIDTH/2 -w/2, SCREEN_HEIGHT/2 -h/2))
+    for obj in room.baked_objs: obj.draw(background)
+    room.background = background
+
+def draw_hud():
+    ''' draw text for room clears and deaths.
+    returns list of Rects that were drawn on '''
+    room = game.room
+    drawn = []
+    text = text_cache.render(F_CLEARS_DEATHS, 'clears: '+str(game.room_to_clears[room.room_num]), C_ROOM_NUM)
     w, h = text.get_size()
-    screen.blit(text, (room.rect.left -w -10, room.rect.top))
-    text = F_CLEARS_DEATHS.render('deaths: '+str(room_to_deaths[room.room_num]), True, C_ROOM_NUM)
+    drawn.append(screen.blit(text, (room.rect.left -w -10, room.rect.top)))
+    text = text_cache.render(F_CLEARS_DEATHS, 'deaths: '+str(game.room_to_deaths[room.room_num]), C_ROOM_NUM)
     w, _ = text.get_size()
-    screen.blit(text, (room.rect.left -w -10, room.rect.top +h + 10))
+    drawn.append(screen.blit(text, (room.rect.left -w -10, room.rect.top +h + 10)))
+    if DEBUG_RENDER_TIME:
+        mode = 'dirty rects' if DIRTY_RECTS else 'full flip'
+        text = text_cache.render(F_DEBUG_TEXT, f'render: {sum(render_times)/max(len(render_times),1):.2f} ms ({mode})', C_DEBUG_TEXT)
+        drawn.append(screen.blit(text, (60,30)))
+    return drawn
+
+def prefetch(work_time):
+    ''' build and bake the rooms the player could go to next, until PREFETCH_BUDGET of the frame has been used.
+    at least one room is built or baked each call, so prefetching still happens when a frame has no time left.
+    only rooms behind the exit closest to the player are baked, up to PREFETCH_BAKED of them.
+    work_time: seconds spent updating and drawing this frame (not waiting for the display) '''
+    import objects
+    start = time.perf_counter()
+    budget = PREFETCH_BUDGET/objects.FPS -work_time
+    bake = bake_candidates()
+    for room in game.prefetched.values(): 
+        if room not in bake: room.background = None # free Surfaces of rooms the player is heading away from
+    while True:
+        baking = [room for room in bake_candidates() if room.background == None]
+        if baking: bake_background(baking[0], game.num_rooms_cleared+2) # the next room's number
+        elif not game.prefetch(): break # every room is ready
+        if time.perf_counter() -start >= budget: break
+
+def bake_candidates():
+    ''' prefetched rooms behind the exit door closest to the player, up to PREFETCH_BAKED of them '''
+    import objects
+    from game import ENTRANCE_DIRS
+    room, player = game.room, game.player
+    exits = [obj for obj in room.objs if type(obj) == objects.Door and obj.dir != room.entrance_dir]
+    if not exits: return []
+    dist = lambda door: (door.rect.centerx -player.rect.centerx)**2 +(door.rect.centery -player.rect.centery)**2
+    entrance_dir = ENTRANCE_DIRS[min(exits, key=dist).dir]
+    return [prefetched for (room_num, dir), prefetched in game.prefetched.items() if dir == entrance_dir][:PREFETCH_BAKED]
+
+def draw_world(alpha=1):
+    ''' returns list of Rects drawn on top of the room background.
+    alpha: how far between the last two ticks to draw moving objects (see Game.alpha) '''
+    room, player = game.room, game.player
+    if room.background == None: bake_background(room)
+    screen.blit(room.background, (0,0)) # walls, floor, room number, and static objects
+
+    drawn = [obj.draw(screen, alpha) for obj in room.drawn_objs]
+    drawn += room.arrows.draw(screen, alpha)
+    drawn.append(room.particles.draw(screen, alpha))
+    if DEBUG: draw_debug() # draw debug HUD
+    drawn.append(player.draw(screen, alpha))
+    drawn += draw_hud()
+    return drawn
+
+def draw_world_dirty(alpha=1):
+    ''' draw world by only restoring and redrawing the parts of the screen that changed.
+    falls back to draw_world when the background changes or debug overlays are shown.
+    returns list of Rects to update on the display '''
+    global dirty_rects, dirty_background
+    room, player = game.room, game.player
+    if room.background == None: bake_background(room)
+    if room.background is not dirty_background or (DEBUG and (DEBUG_GRID or DEBUG_HITBOXES or DEBUG_ARROWS or DEBUG_TEXT_CACHE or DEBUG_PROFILER)):
+        # redraw whole screen
+        dirty_rects = draw_world(alpha)
+        dirty_background = room.background
+        return [screen.get_rect()]
+
+    # erase everything drawn last frame
+    for rect in dirty_rects: screen.blit(room.background, rect, rect)
+
+    # redraw every object that isn't part of the background
+    drawn = [obj.draw(screen, alpha) for obj in room.drawn_objs]
+    drawn += room.arrows.draw(screen, alpha)
+    drawn.append(room.particles.draw(screen, alpha))
+    drawn.append(player.draw(screen, alpha))
+    drawn += draw_hud()
+
+    update = dirty_rects + drawn # old and new positions of everything that was drawn
+    dirty_rects = drawn
+    return update
+
+
+def run(boot_only=False):
+    ''' open window and run game loop.
+    boot_only: return boot times (see profiler.BootProfiler) after the first frame instead of playing '''
+    global game, recorder, DIRTY_RECTS, DEBUG_PROFILER, dirty_rects, dirty_background, render_times
+    boot = profiler.BootProfiler(BOOT_START)
+    boot.phases.append(('imports', time.perf_counter() -BOOT_START)) # importing pygame and this file
+    with boot.phase('pygame init'): pygame.init()
+    with boot.phase('display'): create_window()
+    with boot.phase('fonts'): load_fonts()
+    with boot.phase('assets'):
+        preloader = assets.Preloader(progress=draw_loading) # load every image and sound before the game starts
+        preloader.start()
+        preloader.finish()
+    with boot.phase('objects'): import objects
+    from game import Game, MUSIC_END
+    with boot.phase('first reset'):
+        game = Game((SCREEN_WIDTH, SCREEN_HEIGHT), debug_room=DEBUG_ROOM if DEBUG else 0, 
+            debug_start_pos=DEBUG_START_POS if DEBUG else None, room_clears=DEBUG_ROOM_CLEARS if DEBUG else None)
+    prof = profiler.frame_profiler
+    prof.enabled = PROFILE or PROFILE_CSV != None or DEBUG_PROFILER
+    if PROFILE_CSV: prof.open_csv(PROFILE_CSV)
+    game.time_scale = TIME_SCALE
+    if RECORD_FILE:
+        import replay
+        recorder = replay.Recorder(game, RECORD_FILE)
+
+    ### GAME LOOP ###
+    while 1:
+        with prof.phase('tick'): dt = clock.tick(objects.FPS)/1000 # update time
+        frame_start = time.perf_counter()
+        pressed = pygame.key.get_pressed()
+        with prof.phase('update'): 
+            for _ in range(game.ticks(dt)): # update objects in fixed length ticks
+                game.step(pressed)
+                if recorder != None: recorder.frame(pressed)
+
+        # draw world
+        render_start = time.perf_counter()
+        with prof.phase('draw'):
+            if DIRTY_RECTS: update_rects = draw_world_dirty(game.alpha)
+            else: draw_world(game.alpha)
+        render_time = time.perf_counter() -render_start
+
+        # update screen 
+        render_start = time.perf_counter()
+        work_time = render_start -frame_start # flip is left out, since with vsync it waits for the display
+        with prof.phase('flip'):
+            if DIRTY_RECTS: pygame.display.update(update_rects)
+            else: pygame.display.flip()
+        render_times.append((render_time +time.perf_counter() -render_start)*1000) # prefetching is left out (see the profiler's prefetch phase)
+        if len(render_times) > objects.FPS: render_times.pop(0) # average over last second
+        if PREFETCH: 
+            with prof.phase('prefetch'): prefetch(work_time)
+        if boot.first_frame == None:
+            boot.frame_shown()
+            boot.phases.append(('sheets (during other steps)', objects.clip_compile_time))
+            if DEBUG_BOOT: print('boot (ms):', boot.report())
+            if boot_only: return boot.report()
+
+        for event in pygame.event.get():  # necessary to call one of the pygame.event functions regularly to prevent crashes
+            if event.type == pygame.QUIT: quit()
+            elif event.type == MUSIC_END: 
+                with prof.phase('music'): game.queue_music() # queue next loop of music
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE: quit()
+                elif event.key == pygame.K_f:
+                    # toggle fullscreen
+                    pygame.display.toggle_fullscreen()
+                    dirty_background = None # redraw whole screen
+                elif event.key == pygame.K_r:
+                    # toggle dirty rect rendering
+                    DIRTY_RECTS = not DIRTY_RECTS
+                    dirty_background = None
+                    render_times = []
+                elif event.key == pygame.K_p:
+                    # toggle frame profiler overlay
+                    DEBUG_PROFILER = not DEBUG_PROFILER
+                    prof.enabled = PROFILE or PROFILE_CSV != None or DEBUG_PROFILER
+                    dirty_background = None
+        prof.end_frame(game.room.room_num, len(game.room.objs) +game.room.arrows.count) # after events, so music is counted in this frame
 
 
 ### LOAD GAME ###
-seconds = 0
-deaths = -1
-player = objects.Player(0, 0)
-
-# room info
-room = None
-room_to_clears = {}
-if DEBUG: room_to_clears = DEBUG_ROOM_CLEARS
-room_to_deaths = {}
-start_rooms = {1,2} 
-
-reset()
-start_rooms.add(3)
-
-
-### GAME LOOP ###
-while 1:
-    seconds += clock.tick(objects.FPS)/1000 # update time
-    room.update(player) # update objects
-    draw_world() # draw world
-
-    # queue next loop of music 
-    try: pygame.mixer.music.queue(f'music/{num_rooms_cleared}.mp3') 
-    except: pygame.mixer.music.queue(f'music/{MAX_MUSIC_NUM}.mp3') 
-
-    pygame.display.flip() # update screen 
-
-    for event in pygame.event.get():  # necessary to call one of the pygame.event functions regularly to prevent crashes
-        if event.type == pygame.QUIT: quit()
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE: quit()
-            elif event.key == pygame.K_f:
-                # toggle fullscreen
-                pygame.display.toggle_fullscreen()
+screen = None # display Surface, set by create_window or set_screen
+SCREEN_WIDTH, SCREEN_HEIGHT = 0, 0
+game = None # Game being drawn, set by run
+recorder = None # replay.Recorder, set by run if RECORD_FILE is set
+
+# rendering
+dirty_rects = [] # Rects drawn on last frame, erased by draw_world_dirty
+dirty_background = None # room background dirty_rects were drawn over
+render_times = [] # time to draw and update the screen for recent frames (in milliseconds)
+profiler_lines = [] # text shown by draw_profiler, updated a few times a second
+
+if __name__ == '__main__': run()
@@ -5,9 +5,21 @@ import pygame
 import numpy as np
 import math
 import random
+import time
+import vec
+import assets
+import spatial
 
 # global variables for animations
 FPS = 60
+
+# particles
+PARTICLE_SIZE = 2 # width and height of particles in pixels
+PARTICLE_DRAG = .92 # particle velocity is multiplied by this every frame
+PARTICLE_GRAVITY = .1 # downward acceleration of particles in pixels per frame squared
+MAX_PARTICLES = 65536 # per room
+PARTICLE_COLORS = {'def': (157, 151, 147), 'yellow': (152, 138, 32), 'blue': (44, 44, 176), 'red': (178, 45, 45), # player colors
+    'key': (161, 147, 35), 'crate': (85, 73, 65), 'crumble': (20, 20, 20), 'break': (114, 112, 111)}
 SPRITESHEET_SPACING = 4 # pixels between images in sprite sheet
 ANIMATION_DATA = { 
     # animation data format: img_path : [width, height, {state: [row, frames, duration_in_seconds]}]
@@ -24,38 +36,84 @@ ANIMATION_DATA = {
     'crate-sheet': [48, 48, {'def': [0, 1, 0]}],
     'attack-sheet': [32, 32, {'def': [0, 4, FPS/15]}]
 }
-for name, data in ANIMATION_DATA.items():
-    sprite_sheet = pygame.image.load('img/'+name+'.png').convert_alpha()
-    data.append(sprite_sheet)
+# image transforms for each direction an animation can be drawn in
+# transform format: (flip horizontally, degrees to rotate counterclockwise). flip is applied first
+DIR_TRANSFORMS = {'right': (0, 0), 'left': (1, 0), 'up': (0, 90), 'top': (0, 90), 'down': (0, 270), 'bottom': (0, 270)} # same as Object.set_dir
+GRAVITY_TRANSFORMS = {'down': (0, 0), 'up': (0, 180), 'right': (0, 90), 'left': (0, 270)} # player, dir is direction of gravity
+GRAVITY_VECS = {'down': (0, 1), 'up': (0, -1), 'right': (1, 0), 'left': (-1, 0)} # unit vector in the direction of gravity
+ATTACK_TRANSFORMS = {(1, 0): (0, 0), (0, 1): (0, -90), (0, -1): (0, 90), (-1, 0): (1, 0), 
+    (1, 1): (0, -45), (1, -1): (0, 45), (-1, 1): (1, 45), (-1, -1): (1, -45)} # attack, dir is attack input
+SHEET_TRANSFORMS = {'player-sheet': GRAVITY_TRANSFORMS, 'attack-sheet': ATTACK_TRANSFORMS} # default is DIR_TRANSFORMS
+
+class Clip(object):
+    ''' frames of one animation state, sliced from a sprite sheet and transformed for one direction '''
+    def __init__(self, frames, duration):
+        self.frames = frames # list of Surfaces
+        self.step = len(frames)/duration if len(frames) > 1 else 0 # subtracted from Entity.frame_time every frame
+
+def transform_image(img, transform):
+    ''' apply a transform from DIR_TRANSFORMS, GRAVITY_TRANSFORMS, or ATTACK_TRANSFORMS to an image '''
+    flip, angle = transform
+    if flip: img = pygame.transform.flip(img, 1, 0)
+    if angle: img = pygame.transform.rotate(img, angle)
+    return img
+
+class ClipCache(dict):
+    ''' (sheet name, animation state, dir): Clip
+    a sheet's clips are compiled the first time one of them is used, so sheets aren't loaded until they're needed '''
+    def __missing__(self, key):
+        if key[0] in compiled_sheets: raise KeyError(key)
+        compile_clips(key[0])
+        return self[key]
+
+clips = ClipCache()
+compiled_sheets = set() # names of sheets in clips
+clip_compile_time = 0 # total seconds spent loading and compiling sheets (see main's boot report)
+def compile_clips(name):
+    ''' slice every animation state of a sprite sheet into Clips for every direction it can be drawn in '''
+    global clip_compile_time
+    start = time.perf_counter()
+    w, h, sheet_data = ANIMATION_DATA[name]
+    sprite_sheet = assets.load_image(name) # preloaded by main (see assets.Preloader)
+    transforms = SHEET_TRANSFORMS.get(name, DIR_TRANSFORMS)
+    for state, (row, frames, duration) in sheet_data.items():
+        imgs = [sprite_sheet.subsurface((i*(w+SPRITESHEET_SPACING), row*(h+SPRITESHEET_SPACING), w, h)) for i in range(frames)]
+        compiled = {} # transform: Clip, so directions with the same transform share frames
+        for dir, transform in transforms.items():
+            if transform not in compiled: 
+                compiled[transform] = Clip([transform_image(img, transform) for img in imgs], duration)
+            clips[(name, state, dir)] = compiled[transform]
+    compiled_sheets.add(name)
+    clip_compile_time += time.perf_counter() -start
+
+tiled_imgs = {} # (width, height, animation state, frame, dir): Surface
+def tile_clip(name, state, dir, width, height):
+    ''' tile every frame of a Clip to fill a given size. 
+    used by CrumblePlatform '''
+    w, h = ANIMATION_DATA[name][:2]
+    if dir in ['up', 'down', 'top', 'bottom']: w, h = h, w
+    for i, frame in enumerate(clips[(name, state, dir)].frames):
+        img = pygame.Surface((int(width), int(height)), flags=pygame.SRCALPHA)
+        for x in range(0, int(width), w):
+            for y in range(0, int(height), h): img.blit(frame, (x, y))
+        tiled_imgs[(width, height, state, i, dir)] = img
 
 ### HELPER FUNCTIONS ###
-imgs = {}
+imgs = assets.imgs # name: Surface
 def load_image(name):
-    ''' Load pygame Image from png '''
-    global imgs
-    if name not in imgs.keys(): imgs[name] = pygame.image.load('img/'+name+'.png').convert_alpha()
-    return imgs[name]
+    ''' Load pygame Image from png (usually already loaded by assets.Preloader) '''
+    return assets.load_image(name)
 
-sounds = {}
+sounds = assets.sounds # name: pygame.mixer.Sound
 def play_sound(name):
     ''' load and play a sound effect with a given filename '''
-    global sounds
-    if name not in sounds.keys(): sounds[name] = pygame.mixer.Sound('sound/'+name+'.mp3')
-    sounds[name].play()
-
-def scale_vector(vec, size):
-    ''' scale 2D vector to new size '''
-    try: angle = np.arctan(vec[1]/vec[0]) # in radians
-    except: 
-        if vec[1] == 1: angle = math.pi/2
-        elif vec[1] == -1: angle = math.pi*3/2
-        else: angle = 0
-    sign = np.sign(vec)
-    return np.array([sign[0]*size*abs(math.cos(angle)), sign[1]*size*abs(math.sin(angle))])
+    from game import current as game
+    if game != None and not game.audio: return
+    assets.load_sound(name).play()
 
 def unlock_check(check_obj, collided):
     ''' call Key method to unlock door/crate if collided with locked object and Player has a key
-    called by collision_check
+    called by Player.handle_contacts
     collided: list of solid objects that check_obj has collided with '''
     try:
         if check_obj.keys:
@@ -68,55 +126,38 @@ def unlock_check(check_obj, collided):
 
     except: pass # check_obj has no attribute keys
 
-def collision_check(check_obj, move_vec, platforms, axis=2):
-    ''' checks if obj is colliding with any solid objects in platforms (list)
-    axis: 0 - horizontal only, 1 - vertical only, 2 - both axes 
-    returns updated movement vector '''
-    platforms = [obj for obj in platforms if obj.solid]
-    collided = [] # list of indicies (in platforms)
-    if axis != 1:
-        # check for horizontal collisions
-        move_rect = pygame.Rect(check_obj.rect.left+move_vec[0], check_obj.rect.top, check_obj.width, check_obj.height)
-        collided_x = move_rect.collidelistall([obj.rect for obj in platforms])
-        collided += collided_x
-        if collided_x: 
-            for collide_i in collided_x:
-                obj = platforms[collide_i]
-                # collide with left side of platform
-                if move_rect.right > obj.rect.left and move_rect.right < obj.rect.right:
-                    check_obj.rect.right = obj.rect.left
-                # collide with right side of platform
-                if move_rect.left < obj.rect.right and move_rect.left > obj.rect.left:
-                    check_obj.rect.left = obj.rect.right
-                move_vec[0] = 0
-    if axis != 0:
-        # check vertical collisions
-        move_rect = pygame.Rect(check_obj.rect.left, check_obj.rect.top+move_vec[1], check_obj.width, check_obj.height)
-        collided_y = move_rect.collidelistall([obj.rect for obj in platforms])
-        collided += collided_y
-        if collided_y: 
-            for collide_i in collided_y:
-                obj = platforms[collide_i]
-                # collide with top of platform
-                if move_rect.bottom > obj.rect.top and move_rect.bottom < obj.rect.bottom:
-                    check_obj.rect.bottom = obj.rect.top
-                # collide with bottom of platform
-                if move_rect.top < obj.rect.bottom and move_rect.top > obj.rect.top:
-                    check_obj.rect.top = obj.rect.bottom
-                move_vec[1] = 0
-    
-    # check for collisions with locked doors if check_obj has key  
-    collided = [platforms[i] for i in collided]
-    unlock_check(check_obj, collided)
-    for obj in collided:
-        if type(obj) == CrumblePlatform: obj.crumble()
-
-    return move_vec
+def move_to_contact(rect, vel, rects):
+    ''' sweep rect along vel (see spatial.sweep) and, if it hits something, move rect against it.
+    vel should be along one axis.
+    returns list of indices (in rects) of everything rect ends up touching in the direction of vel (empty if nothing was hit) '''
+    t, normal, i = spatial.sweep(rect, vel, rects)
+    if i == -1: return []
+    hit = rects[i]
+    if normal[0] < 0: rect.right = hit.left
+    elif normal[0] > 0: rect.left = hit.right
+    elif normal[1] < 0: rect.bottom = hit.top
+    else: rect.top = hit.bottom
+    return rect.move(-normal[0], -normal[1]).collidelistall(rects)
+
+
+class Contacts(object):
+    ''' everything the player touched in one tick, found by Player.resolve_collisions '''
+    def __init__(self, nearby):
+        self.nearby = nearby # objects near the player's path and attack hitbox, in drawing order
+        self.solids = [] # solid objects moved against or stood on (for unlocking and crumbling)
+        self.blocked = [False, False] # whether movement was stopped on each axis (x, y)
+        self.ground = [] # solid objects touching the player in the direction of gravity (platforming rooms only)
+        self.touching = [] # non-solid objects overlapping the player after moving, or deadly ones it moved through, in drawing order (for deaths, doors, and pickups)
 
 
 ### OBJECTS ###
 class Object(object):
     ''' basic game object with size, location, and image '''
+    dynamic = False # whether update can change the object. only dynamic objects are updated by rooms
+    moves = False # whether the object can move. objects that can't are drawn into their room's occupancy grid (see spatial.OccupancyGrid)
+    crumbles = False # whether the object breaks after being stood on (BREAKABLE in the occupancy grid, like breakable objects)
+    baked = True # whether the object is drawn once onto its room's background instead of every frame
+
     def __init__(self, img_name, x, y, dir='right'):
         self.name = img_name
         self.img = load_image(img_name) # get image
@@ -133,12 +174,21 @@ class Object(object):
         self.deadly = False # whether an object hurts the player
         self.solid = False # whether an object impedes movement
         self.breakable = False # whether an object breaks when attacked
+        self.room = None # room the object is in, set by Room.add_obj
+        self.prev_pos = None # position before the last tick, set by Game.step (see draw_pos)
 
     def update(self): pass
 
     def set_pos(self, x, y):
         self.rect.x = x
         self.rect.y = y
+        self.prev_pos = None # don't draw object in between old and new position
+
+    def draw_pos(self, alpha=1):
+        ''' position to draw at, alpha (0 to 1) of the way from the position before the last tick to the current one '''
+        if self.prev_pos == None or alpha >= 1: return self.rect.topleft
+        x, y = self.prev_pos
+        return round(x +(self.rect.x -x)*alpha), round(y +(self.rect.y -y)*alpha)
 
     def move(self, vec):
         ''' move object with a vector '''
@@ -160,25 +210,97 @@ class Object(object):
         self.width, self.height = self.height, self.width
         self.rect = pygame.Rect(self.rect.x, self.rect.y, self.width, self.height)
 
-    def draw(self, surface):
-        surface.blit(self.img, (self.rect.x, self.rect.y))
-
-
-class Particle(object):
-    ''' particle  '''
-    def __init__(self, x, y, vel, lifespan):
-        self.x, self.y = x, y
-        self.vel = vel
-        self.lifespan = lifespan # frames particle will exist
+    def draw(self, surface, alpha=1):
+        ''' returns Rect of surface that was drawn on.
+        alpha: how far between the last two ticks to draw the object (see draw_pos) '''
+        return surface.blit(self.img, self.draw_pos(alpha))
+
+
+class Particles(object):
+    ''' every particle in a room.
+    particles are stored in arrays (instead of as objects) so they can all be moved and drawn at once.
+    they're only visual, so they use their own random generator and don't change the game's random numbers (see replay.py) '''
+    def __init__(self, capacity=1024):
+        self.count = 0 # live particles, stored in the first count rows of each array
+        self.pos = np.zeros((capacity, 2), np.float32) # x, y
+        self.vel = np.zeros((capacity, 2), np.float32) # pixels per frame
+        self.life = np.zeros(capacity, np.int32) # frames left
+        self.color = np.zeros((capacity, 3), np.uint8)
+        self.rng = np.random.default_rng()
+
+    def grow(self, size):
+        ''' make arrays big enough for size particles '''
+        capacity = len(self.life)
+        while capacity < size: capacity *= 2
+        for name in ['pos', 'vel', 'life', 'color']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) +old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def emit(self, rect, n, color, speed=3, lifespan=FPS//2):
+        ''' add n particles at random points in rect, flying in random directions.
+        speed: max speed in pixels per frame
+        lifespan: max frames particles exist for '''
+        n = min(n, MAX_PARTICLES -self.count)
+        if n <= 0: return
+        if self.count +n > len(self.life): self.grow(self.count +n)
+        rng, i, j = self.rng, self.count, self.count +n
+        self.pos[i:j, 0] = rng.uniform(rect.left, rect.right, n)
+        self.pos[i:j, 1] = rng.uniform(rect.top, rect.bottom, n)
+        angle, vel = rng.uniform(0, 2*math.pi, n), rng.uniform(0, speed, n)
+        self.vel[i:j, 0] = np.cos(angle)*vel
+        self.vel[i:j, 1] = np.sin(angle)*vel
+        self.life[i:j] = rng.integers(lifespan//2, lifespan +1, n)
+        self.color[i:j] = np.clip(np.array(color) +rng.integers(-20, 21, (n, 1)), 0, 255) # vary brightness
+        self.count = j
 
     def update(self):
-        self.x += self.vel[0]
-        self.y += self.vel[1]
-        self.lifespan -= 1
+        ''' move particles and remove dead ones. runs every frame '''
+        n = self.count
+        if not n: return
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n] *= PARTICLE_DRAG
+        self.vel[:n, 1] += PARTICLE_GRAVITY
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        if not alive.all():
+            # move live particles to the front of the arrays
+            keep = np.flatnonzero(alive)
+            for arr in [self.pos, self.vel, self.life, self.color]: arr[:len(keep)] = arr[keep]
+            self.count = len(keep)
+
+    def draw(self, surface, alpha=1):
+        ''' draw every particle as a square by writing to surface's pixels directly.
+        alpha: how far between the last two frames to draw particles (see Object.draw_pos)
+        returns Rect of surface that was drawn on '''
+        n = self.count
+        if not n: return pygame.Rect(0, 0, 0, 0)
+        pos = self.pos[:n] -self.vel[:n]*(1 -alpha)
+        w, h = surface.get_size()
+        # particles that aren't all the way on surface aren't drawn (they'd be written out of bounds)
+        on = (pos[:, 0] >= 0) & (pos[:, 0] <= w -PARTICLE_SIZE) & (pos[:, 1] >= 0) & (pos[:, 1] <= h -PARTICLE_SIZE)
+        if not on.any(): return pygame.Rect(0, 0, 0, 0)
+        x, y = pos[on, 0].astype(np.int32), pos[on, 1].astype(np.int32)
+
+        # pack colors into surface's pixel format
+        color = self.color[:n][on].astype(np.uint32)
+        shifts, losses = surface.get_shifts(), surface.get_losses()
+        packed = np.uint32(surface.get_masks()[3]) # opaque
+        for i in range(3): packed = packed | (color[:, i] >> losses[i]) << shifts[i]
+
+        pixels = pygame.surfarray.pixels2d(surface) # locks surface until deleted
+        for dx in range(PARTICLE_SIZE):
+            for dy in range(PARTICLE_SIZE): pixels[x +dx, y +dy] = packed
+        del pixels
+        left, top = x.min(), y.min()
+        return pygame.Rect(left, top, x.max() -left +PARTICLE_SIZE, y.max() -top +PARTICLE_SIZE)
 
 
 class Entity(Object):
     ''' animated game object '''
+    baked = False
+
     def __init__(self, spritesheet_name, x, y, dir='right'):
         self.name = spritesheet_name
         self.img = None # set by update frame
@@ -200,18 +322,21 @@ class Entity(Object):
 
     def update_frame(self):
         ''' update animation frame by modifying self.img 
-        must account for object direction when getting subsurface '''
-        frames = ANIMATION_DATA[self.name][2][self.animation_state][1]
-        if frames > 1:
+        frames are already transformed for the object's direction (see compile_clips) '''
+        clip = clips[(self.name, self.animation_state, self.dir)]
+        if clip.step:
             # increment frames
             if self.frame_time <= 0:
                 self.frame_time = 1
                 self.frame += 1
-                if self.frame >= frames: self.frame = 0
-            self.frame_time -= frames/ANIMATION_DATA[self.name][2][self.animation_state][2] # update frame time based on animation duration
-        w, h = ANIMATION_DATA[self.name][:2] # use ANIMATION_DATA instead of self.width and self.height because of object direction!
-        self.img = ANIMATION_DATA[self.name][3].subsurface((self.frame*(w+SPRITESHEET_SPACING), \
-            ANIMATION_DATA[self.name][2][self.animation_state][0]*(h+SPRITESHEET_SPACING), w, h))
+                if self.frame >= len(clip.frames): self.frame = 0
+            self.frame_time -= clip.step # update frame time based on animation duration
+        self.img = clip.frames[self.frame]
+
+    def set_dir(self, dir):
+        ''' set direction object is facing. 
+        doesn't transform self.img, update_frame picks frames for the direction '''
+        self.dir = dir
 
     def set_animation_state(self, state):
         ''' changes active row in spritesheet for animation. '''
@@ -219,9 +344,9 @@ class Entity(Object):
         self.frame = 0 # current frame being drawn, column in spritesheet
         self.frame_time = 1 # counts down to 0, increments frame
 
-    def draw(self, surface):
+    def draw(self, surface, alpha=1):
         self.update_frame()
-        surface.blit(self.img, (self.rect.x, self.rect.y))
+        return surface.blit(self.img, self.draw_pos(alpha))
 
 
 class Player(Entity):
@@ -233,9 +358,11 @@ class Player(Entity):
         self.color = 'def'
         self.powerup_key = pygame.K_SPACE
         
-        from main import MOVE_SPEED
+        from game import MOVE_SPEED
         self.speed = MOVE_SPEED
         self.keys = [] # list of key objects
+        from game import Inputs
+        self.pressed = Inputs() # keys held down this frame, set by Game.step
 
         # for dash powerup
         self.dash_speed = self.speed*2 # initial speed when dashing
@@ -245,7 +372,7 @@ class Player(Entity):
 
         # for attack powerup
         self.attack_reach = self.width/2 # how far beyond player hitbox an attack extends (in pixels)
-        self.attack_img = None # set by update_frame
+        self.attack_img = None # set by update_attack
         self.attack_input = None # set by powerup_dash
         self.attack = False # whether currently attacking. for slash animation
         self.attack_frame_time = 1 # counts down to 0, increments frame
@@ -260,22 +387,17 @@ class Player(Entity):
     
     def update_8d(self, room):
         ''' for player controls in 8-direction movement rooms (Room_8D) '''
-        pressed = pygame.key.get_pressed()
+        pressed = self.pressed
 
         # movement
         dir = [pressed[pygame.K_a], pressed[pygame.K_d], pressed[pygame.K_s], pressed[pygame.K_w]]
-        move_vec = scale_vector([dir[1]-dir[0], dir[2]-dir[3]], self.speed)
+        move_vec = vec.scale((dir[1]-dir[0], dir[2]-dir[3]), self.speed)
         move_vec = self.powerup_dash(move_vec, pressed) # dash powerup
-        move_vec = collision_check(self, move_vec, room.objs) # check for collisions with platforms (solid objects)
-        self.move(move_vec)
-        self.powerup_attack(pressed, room) # attack powerup
-
-        # collisions with interactable objects
-        self.check_interactable_collisions(room)
+        self.handle_contacts(room, self.resolve_collisions(room, move_vec), pressed)
 
     def update_platform(self, room):
         ''' for player controls in platforming room (Room_Platform) '''
-        pressed = pygame.key.get_pressed()
+        pressed = self.pressed
 
         # deal with direction of room gravity
         gravity = room.gravity
@@ -298,17 +420,11 @@ class Player(Entity):
         if room.gravity_dir in ['down', 'up']: # vertival gravity
             dir = [pressed[pygame.K_a], pressed[pygame.K_d]]
             move_vec = [self.speed*(dir[1]-dir[0]), 0]
-
-            # check for horizontal collisions
-            move_vec[0] = collision_check(self, move_vec, room.objs, axis=0)[0]
-        
+            axis = 1 # axis of gravity
         else: # horizontal gravity
             dir = [pressed[pygame.K_w], pressed[pygame.K_s]]
             move_vec = [0, self.speed*(dir[1]-dir[0])]
-
-            # check for vertical collisions
-            move_vec[1] = collision_check(self, move_vec, room.objs, axis=1)[1]
-            
+            axis = 0
 
         # MOVEMENT (parallel to gravity)
         # apply gravity
@@ -325,84 +441,70 @@ class Player(Entity):
             # add jump velocity
             self.y_vel -= jump *self.jump_timer/self.jump_time
             self.jump_timer -= 1
-
-        # check for collisions
-        if room.gravity_dir in ['down', 'up']: # vertical gravity
-            move_vec[1] = self.y_vel
-            move_rect = pygame.Rect(self.rect.left, self.rect.top+move_vec[1], self.width, self.height)
-        else:  # horizontal gravity
-            move_vec[0] = self.y_vel      
-            move_rect = pygame.Rect(self.rect.left+move_vec[0], self.rect.top, self.width, self.height)
-        collided = move_rect.collidelistall([obj.rect for obj in room.objs])
-        if collided: 
-            for collide_i in collided:
-                if room.objs[collide_i].solid: 
-                    obj = room.objs[collide_i]
-
-                    # vertical gravity
-                    if room.gravity_dir in ['down', 'up']: 
-                        # collide with top of platform, reset jump
-                        if move_rect.bottom > obj.rect.top and move_rect.bottom < obj.rect.bottom:
-                            self.rect.bottom = obj.rect.top
-                            self.y_vel = 0
-                            if room.gravity_dir == 'down':
-                                self.in_air = False
-                                self.jump_timer = 0
-                        # collide with bottom of platform
-                        elif move_rect.top < obj.rect.bottom and move_rect.top > obj.rect.top:
-                            self.rect.top = obj.rect.bottom
-                            self.y_vel = 0 # so player falls instead of floating on ceiling for the rest of the jump time
-                            if room.gravity_dir == 'up':
-                                self.in_air = False
-                                self.jump_timer = 0
-                        move_vec[1] = 0
-                    
-                    # horizontal graivty
-                    else: 
-                        # collide with left side of platform
-                        if move_rect.right > obj.rect.left and move_rect.right < obj.rect.right:
-                            self.rect.right = obj.rect.left
-                            self.y_vel = 0
-                            if room.gravity_dir == 'right':
-                                self.in_air = False
-                                self.jump_timer = 0
-                        # collide with right side of platform
-                        if move_rect.left < obj.rect.right and move_rect.left > obj.rect.left:
-                            self.rect.left = obj.rect.right
-                            self.y_vel = 0
-                            if room.gravity_dir == 'left':
-                                self.in_air = False
-                                self.jump_timer = 0
-                        move_vec[0] = 0
-
-            # collisions with interactable SOLID objects
-            collided = [room.objs[i] for i in collided]
-            unlock_check(self, collided)
-            for obj in collided: # start crumble
-                if type(obj) == CrumblePlatform: obj.crumble()
-
-        # no collisions in direction of gravity
-        else: self.in_air = True
+        move_vec[axis] = self.y_vel
 
         # MOVE
-        move_vec = self.powerup_dash(move_vec, pressed)
-        self.move(move_vec)
-
-        self.powerup_attack(pressed, room) # attack powerup
-
-        # check for collisions with interactable NON-SOLID objects
-        self.check_interactable_collisions(room)
-
-    def check_interactable_collisions(self, room):
-        ''' collisions with interactable objects.
-        this includes: deadly objects, doors, flags '''
-        collide_i = self.rect.collidelist([obj.rect for obj in room.objs])
-        if collide_i != -1:
-            obj = room.objs[collide_i]
-            if obj.deadly: self.die()
+        move_vec = self.powerup_dash(move_vec, pressed) # dashing replaces movement
+        contacts = self.resolve_collisions(room, move_vec, room.gravity_dir)
+        if contacts.blocked[axis]: self.y_vel = 0 # landed, or hit a ceiling and falls instead of floating on it for the rest of the jump time
+        if contacts.ground: 
+            self.in_air = False
+            self.jump_timer = 0
+        else: self.in_air = True
+        self.handle_contacts(room, contacts, pressed)
+
+    def resolve_collisions(self, room, move_vec, gravity_dir=None):
+        ''' move the player by move_vec, stopping at solid objects, and find everything it touched.
+        nearby objects are queried from the room once, covering the player's path and attack hitbox.
+        each axis is swept (see move_to_contact), so fast movement can't pass through thin platforms,
+        and deadly objects anywhere along the path count as touched, so it can't pass through thin spikes either.
+        gravity_dir: direction of gravity in platforming rooms. movement along it is resolved last
+        returns Contacts '''
+        reach = 2*self.attack_reach
+        nearby = room.query(self.rect.union(self.rect.move(move_vec)).inflate(reach, reach))
+        contacts = Contacts(nearby)
+        solids = [obj for obj in nearby if obj.solid]
+        rects = [obj.rect for obj in solids]
+        path = [] # area covered while moving along each axis
+        for axis in ([1, 0] if gravity_dir in ['left', 'right'] else [0, 1]):
+            vel = (move_vec[0], 0) if axis == 0 else (0, move_vec[1])
+            if not vel[axis]: continue
+            start = self.rect.copy()
+            collided = move_to_contact(self.rect, vel, rects)
+            if collided: 
+                contacts.blocked[axis] = True
+                contacts.solids += [solids[i] for i in collided]
+            else: self.move(vel)
+            path.append(start.union(self.rect))
+
+        if gravity_dir: 
+            contacts.ground = [solids[i] for i in self.rect.move(GRAVITY_VECS[gravity_dir]).collidelistall(rects)]
+            contacts.solids += [obj for obj in contacts.ground if obj not in contacts.solids]
+        # the occupancy grid rules out deadly objects along the path without checking each one (moving ones aren't in it)
+        fixed_hazards = any(room.grid.area(rect) & spatial.DEADLY for rect in path)
+        contacts.touching = [obj for obj in nearby if not obj.solid and (self.rect.colliderect(obj.rect) 
+            or (obj.deadly and (fixed_hazards or obj.moves) and obj.rect.collidelist(path) != -1))]
+        return contacts
+
+    def handle_contacts(self, room, contacts, pressed):
+        ''' unlock, crumble, attack, die, exit the room, and pick things up, from what the player touched (see resolve_collisions) '''
+        # interactable SOLID objects
+        unlock_check(self, contacts.solids)
+        for obj in contacts.solids: # start crumble
+            if type(obj) == CrumblePlatform: obj.crumble()
+
+        self.powerup_attack(pressed, room, contacts.nearby) # attack powerup
+
+        # interactable NON-SOLID objects
+        for obj in contacts.touching:
+            if obj.room is not room: continue # destroyed by attack
+            if obj.deadly: 
+                self.die()
+                return
             elif (type(obj) == Door and obj.in_door(self)): 
-                from main import load_room
-                load_room(obj)
+                from game import current as game
+                game.load_room(obj)
+                return
             elif type(obj) == Key and obj not in self.keys:
                 if self.keys: obj.follow_obj = self.keys[-1]
                 else: obj.follow_obj = self
@@ -410,24 +512,17 @@ class Player(Entity):
                 play_sound('key')
             elif type(obj) == Powerup:
                 self.set_color(obj.color)
-                room.objs.remove(obj)
+                room.remove_obj(obj)
+        if room.arrows.collide(self.rect).any(): self.die()
                 
     def die(self):
-        from main import room
-        room.pause = True
-        room.death_seq = True
+        from game import current as game
+        game.room.pause = True
+        game.room.death_seq = True
         self.set_animation_state(f'{self.color}-death')
+        game.room.particles.emit(self.rect, 80, PARTICLE_COLORS[self.color], speed=5, lifespan=FPS)
         play_sound('death')
-        pygame.mixer.music.pause() # stop music
-
-    def set_dir(self, dir):
-        ''' update image to a given gravity direction
-        dir: str, 'left', 'right', 'up', 'down' '''
-        self.dir = dir
-        if dir == 'down': return
-        elif dir == 'up': self.img = self.img = pygame.transform.rotate(self.img, 180)
-        elif dir == 'right': self.img = pygame.transform.rotate(self.img, 90)
-        elif dir == 'left': self.img = pygame.transform.rotate(self.img, 270)
+        if game.audio: pygame.mixer.music.pause() # stop music
 
     def set_color(self, color):
         self.color = color
@@ -436,28 +531,29 @@ class Player(Entity):
     def powerup_dash(self, move_vec, keys_pressed):
         ''' check if dash powerup is being used.
         if so, initiate or continue the dash '''
-        input_vec = [keys_pressed[pygame.K_d]-keys_pressed[pygame.K_a], keys_pressed[pygame.K_s]-keys_pressed[pygame.K_w]]
+        input_vec = (keys_pressed[pygame.K_d]-keys_pressed[pygame.K_a], keys_pressed[pygame.K_s]-keys_pressed[pygame.K_w])
 
         if self.color == 'blue' and keys_pressed[self.powerup_key] \
             and any(input_vec):
             # initiate dash
             self.set_color('def')
-            self.dash_vec = scale_vector(input_vec, self.dash_speed)
+            self.dash_vec = vec.scale(input_vec, self.dash_speed)
             self.dash_timer = self.dash_time
             self.y_vel = 0
             return self.dash_vec
         elif self.dash_timer > 0:
             # continue dash
             self.dash_timer -= 1
-            self.dash_vec = scale_vector(input_vec, max(self.dash_speed *self.dash_timer/self.dash_time, self.speed))
+            self.dash_vec = vec.scale(input_vec, max(self.dash_speed *self.dash_timer/self.dash_time, self.speed))
             self.y_vel = 0
             return self.dash_vec
         
         else: return move_vec # no dash
 
-    def powerup_attack(self, keys_pressed, room):
+    def powerup_attack(self, keys_pressed, room, nearby):
         ''' check if attack powerup is being used.
-        if so, attack and check for breakable objects '''
+        if so, attack and check for breakable objects.
+        nearby: objects that could be in the hitbox (see resolve_collisions) '''
         attack_input = [keys_pressed[pygame.K_d]-keys_pressed[pygame.K_a], keys_pressed[pygame.K_s]-keys_pressed[pygame.K_w]]
 
         if self.color == 'red' and keys_pressed[self.powerup_key] \
@@ -468,64 +564,50 @@ class Player(Entity):
 
             # get hitbox
             hitbox = pygame.Rect(self.rect.left, self.rect.top, self.width, self.height)
-            if self.attack_input[0]: hitbox.x += np.sign(self.attack_input[0]) * self.attack_reach
-            if self.attack_input[1]: hitbox.y += np.sign(self.attack_input[1]) * self.attack_reach
+            if self.attack_input[0]: hitbox.x += vec.sign(self.attack_input[0]) * self.attack_reach
+            if self.attack_input[1]: hitbox.y += vec.sign(self.attack_input[1]) * self.attack_reach
             
             # check for breakable objects
             destroy = []
-            collided = hitbox.collidelistall([obj.rect for obj in room.objs])
+            collided = hitbox.collidelistall([obj.rect for obj in nearby])
             for i in collided:
-                obj = room.objs[i]
+                obj = nearby[i]
                 if obj.breakable: destroy.append(obj)
-            for obj in destroy: room.objs.remove(obj)
-
-    def update_frame(self):
-        ''' update animation frame by modifying self.img 
-        accounts for attack powerup animation '''
-        super().update_frame()
-
-        # attack animation
+            for obj in destroy: 
+                room.particles.emit(obj.rect, 20, PARTICLE_COLORS['break'])
+                room.remove_obj(obj)
+            hit = room.arrows.collide(hitbox)
+            if hit.any():
+                for rect in room.arrows.rects(hit): room.particles.emit(rect, 20, PARTICLE_COLORS['break'])
+                room.arrows.remove(hit)
+
+    def update_attack(self):
+        ''' advance attack powerup animation, ending the attack when it finishes.
+        called every frame by Game.step (not by draw, so the game plays the same without a window) '''
         if self.attack:      
-            w, h, sheet_data, sprite_sheet = ANIMATION_DATA['attack-sheet'] # use ANIMATION_DATA instead of self.width and self.height because of object direction!
+            clip = clips[('attack-sheet', 'def', tuple(self.attack_input))] # frames rotated for attack direction
             # increment frames
             if self.attack_frame_time <= 0:
                 self.attack_frame_time = 1
                 self.attack_frame += 1
-                if self.attack_frame >= sheet_data['def'][1]: 
+                if self.attack_frame >= len(clip.frames): 
                     self.attack_frame = 0
                     self.attack = False
                     self.set_color('def') # done attacking, set color back to default
-            self.attack_frame_time -= sheet_data['def'][1] /sheet_data['def'][2] # update frame time based on animation duration
-            self.attack_img = sprite_sheet.subsurface((self.attack_frame*(w+SPRITESHEET_SPACING), 0, w, h))
-            
-            # rotate image based on attack direction 
-            if self.attack_input == [0, 1]: # attack down
-                self.attack_img = pygame.transform.rotate(self.attack_img, -90)
-            elif self.attack_input == [0, -1]: # attack up
-                self.attack_img = pygame.transform.rotate(self.attack_img, 90)
-            elif self.attack_input == [-1, 0]: # attack left
-                self.attack_img = pygame.transform.flip(self.attack_img, 1, 0)
-            elif self.attack_input == [1, 1]: # attack down-right
-                self.attack_img = pygame.transform.rotate(self.attack_img, -45)
-            elif self.attack_input == [1, -1]: # attack up-right
-                self.attack_img = pygame.transform.rotate(self.attack_img, 45)
-            elif self.attack_input == [-1, 1]: # attack down-left
-                self.attack_img = pygame.transform.flip(self.attack_img, 1, 0)
-                self.attack_img = pygame.transform.rotate(self.attack_img, 45)
-            elif self.attack_input == [-1, -1]: # attack up-left
-                self.attack_img = pygame.transform.flip(self.attack_img, 1, 0)
-                self.attack_img = pygame.transform.rotate(self.attack_img, -45)
-
-    def draw(self, surface):
+            self.attack_frame_time -= clip.step # update frame time based on animation duration
+            self.attack_img = clip.frames[self.attack_frame]
+
+    def draw(self, surface, alpha=1):
         self.update_frame()
-        self.set_dir(self.dir)
-        surface.blit(self.img, (self.rect.x, self.rect.y))
+        pos = self.draw_pos(alpha)
+        drawn = surface.blit(self.img, pos)
         if self.attack: 
-            x, y = self.rect.center
-            if self.attack_input[0]: x += np.sign(self.attack_input[0]) * self.attack_reach
-            if self.attack_input[1]: y += np.sign(self.attack_input[1]) * self.attack_reach
+            x, y = pos[0] +self.width//2, pos[1] +self.height//2 # center of player
+            if self.attack_input[0]: x += vec.sign(self.attack_input[0]) * self.attack_reach
+            if self.attack_input[1]: y += vec.sign(self.attack_input[1]) * self.attack_reach
             temp_rect = self.attack_img.get_rect(center=(x, y)) # so diagonal attack position is correct (because pygame.transform.rotate changes image size)
-            surface.blit(self.attack_img, (temp_rect.x, temp_rect.y))
+            drawn = drawn.union(surface.blit(self.attack_img, (temp_rect.x, temp_rect.y)))
+        return drawn
 
 
 class Door(Entity):
@@ -540,11 +622,7 @@ class Door(Entity):
         super().set_animation_state(state)
         if state == 'def' or state == 'locked': self.solid = True
         elif state == 'open': self.solid = False
-
-    def draw(self, surface):
-        self.update_frame()
-        self.set_dir(self.dir)
-        surface.blit(self.img, (self.rect.x, self.rect.y))
+        if self.room != None: self.room.update_solid(self) # door may have opened or closed
 
     def in_door(self, player):
         ''' check if player is in transition point of door '''
@@ -556,12 +634,14 @@ class Door(Entity):
         return False
 
 
+scaled_platforms = {} # (width, height): platform image scaled to that size
 class Plaform(Object):
     ''' solid object player cannot move through '''
     def __init__(self, x, y, width, height):
         self.name = 'platform'
-        self.img = load_image(self.name) # get image
-        self.img = pygame.transform.scale(self.img, (int(width), int(height)))
+        size = (int(width), int(height))
+        if size not in scaled_platforms: scaled_platforms[size] = pygame.transform.scale(load_image(self.name), size)
+        self.img = scaled_platforms[size] # shared by platforms of the same size
 
         # create rect
         self.width, self.height = width, height
@@ -574,6 +654,9 @@ class Plaform(Object):
 
 class CrumblePlatform(Entity):
     ''' platform object player can stand on for a second before it breaks '''
+    dynamic = True # for its crumble timer. it doesn't move, so it's still in the occupancy grid
+    crumbles = True
+
     def __init__(self, x, y, width, height):
         self.name = 'crumble_platform-sheet'
         self.set_animation_state('def') # 'def' is default state for animations
@@ -596,8 +679,8 @@ class CrumblePlatform(Entity):
         if self.crumbling:
             if self.crumble_time > 0: self.crumble_time -= 1
             else: 
-                from main import room
-                room.objs.remove(self)
+                self.room.particles.emit(self.rect, self.width*self.height//100, PARTICLE_COLORS['crumble'], speed=1)
+                self.room.remove_obj(self)
 
     def crumble(self):
         ''' initiate crumbling of platform '''
@@ -607,41 +690,104 @@ class CrumblePlatform(Entity):
 
     def update_frame(self):
         ''' update animation frame by modifying self.img 
-        must account for object direction when getting subsurface '''
-        w, h, sheet_data, sprite_sheet = ANIMATION_DATA[self.name]
-        frames = sheet_data[self.animation_state][1]
-        if frames > 1:
-            # increment frames
-            if self.frame_time <= 0:
-                self.frame_time = 1
-                self.frame += 1
-                if self.frame >= frames: self. frame = 0
-            self.frame_time -= frames/sheet_data[self.animation_state][2] # update frame time based on animation duration
-        self.img = sprite_sheet.subsurface((self.frame*(w+SPRITESHEET_SPACING), \
-            sheet_data[self.animation_state][0]*(h+SPRITESHEET_SPACING), w, h))
-        
-        # size image
-        img = pygame.Surface((self.width, self.height), flags=pygame.SRCALPHA)
-        for i in range((self.width//w)+1):
-            for j in range((self.height//h)+1):
-                img.blit(self.img, (i*w, j*h))
-        self.img = img
-
-
-class Arrow(Object):
-    def __init__(self, x, y, dir='right'):
-        super().__init__('arrow', x, y, dir=dir)
-        from main import MOVE_SPEED
+        uses the current frame tiled to fill the platform (shared by platforms of the same size) '''
+        super().update_frame()
+        key = (self.width, self.height, self.animation_state, self.frame, self.dir)
+        if key not in tiled_imgs: tile_clip(self.name, self.animation_state, self.dir, self.width, self.height)
+        self.img = tiled_imgs[key]
+
+
+ARROW_DIRS = ['right', 'left', 'up', 'down'] # indices in Arrows.dir
+ARROW_VECS = [(1, 0), (-1, 0), (0, -1), (0, 1)] # direction of each of ARROW_DIRS
+MAX_ARROW_RECTS = 64 # most Rects returned by Arrows.draw. more arrows than this are updated on the display as one Rect
+arrow_imgs = [] # arrow image facing each of ARROW_DIRS, set by arrow_images
+
+def arrow_images():
+    ''' arrow images for each of ARROW_DIRS, rotated the same as Object.set_dir '''
+    if not arrow_imgs:
+        img = load_image('arrow')
+        arrow_imgs.extend([img, pygame.transform.flip(img, 1, 0), pygame.transform.rotate(img, 90), pygame.transform.rotate(img, 270)])
+    return arrow_imgs
+
+class Arrows(object):
+    ''' every arrow in a room. arrows are deadly and breakable.
+    like Particles, arrows are stored in arrays (instead of as objects) so they can all be moved, checked for collisions, and drawn at once.
+    they're removed after flying past the edge of the room's bounds '''
+    def __init__(self, capacity=64):
+        self.count = 0 # live arrows, stored in the first count rows of each array
+        self.pos = np.zeros((capacity, 2)) # x, y of top left corner
+        self.vel = np.zeros((capacity, 2)) # pixels per frame
+        self.size = np.zeros((capacity, 2), np.int32) # width, height
+        self.dir = np.zeros(capacity, np.int8) # index in ARROW_DIRS
+        self.high_water = 0 # most arrows in the room at once
+        self.moved = False # whether arrows moved in the last tick. if not, they're drawn where they are (see draw)
+        from game import MOVE_SPEED
         self.speed = MOVE_SPEED*1.5
-        self.deadly = True
-        self.breakable = True
 
-    def update(self):
-        ''' runs every frame '''
-        if self.dir == 'right': self.move([self.speed,0])
-        if self.dir == 'left': self.move([-self.speed,0])
-        if self.dir == 'up': self.move([0,-self.speed])
-        if self.dir == 'down': self.move([0,self.speed])
+    def grow(self, size):
+        ''' make arrays big enough for size arrows '''
+        capacity = len(self.dir)
+        while capacity < size: capacity *= 2
+        for name in ['pos', 'vel', 'size', 'dir']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) +old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, dir='right'):
+        ''' add an arrow with its top left corner at x, y, flying towards dir '''
+        if self.count == len(self.dir): self.grow(self.count +1)
+        i, d = self.count, ARROW_DIRS.index(dir)
+        self.pos[i] = x, y
+        self.vel[i] = vec.scale(ARROW_VECS[d], self.speed)
+        self.size[i] = arrow_images()[d].get_size()
+        self.dir[i] = d
+        self.count += 1
+        if self.count > self.high_water: self.high_water = self.count
+
+    def update(self, bounds):
+        ''' move arrows and remove ones that have passed the edge of bounds (Rect) they're flying towards. runs every frame '''
+        self.moved = True
+        n = self.count
+        if not n: return
+        pos, vel = self.pos[:n], self.vel[:n]
+        pos += vel
+        end = pos +self.size[:n] # bottom right corners
+        passed = ((vel[:, 0] > 0) & (pos[:, 0] >= bounds.right)) | ((vel[:, 0] < 0) & (end[:, 0] <= bounds.left)) \
+            | ((vel[:, 1] > 0) & (pos[:, 1] >= bounds.bottom)) | ((vel[:, 1] < 0) & (end[:, 1] <= bounds.top))
+        if passed.any(): self.remove(passed)
+
+    def collide(self, rect):
+        ''' returns array of whether each live arrow overlaps rect '''
+        n = self.count
+        pos, end = self.pos[:n], self.pos[:n] +self.size[:n]
+        return (pos[:, 0] < rect.right) & (end[:, 0] > rect.left) & (pos[:, 1] < rect.bottom) & (end[:, 1] > rect.top)
+
+    def remove(self, mask):
+        ''' remove arrows where mask (from collide or update) is true '''
+        keep = np.flatnonzero(~mask)
+        for arr in [self.pos, self.vel, self.size, self.dir]: arr[:len(keep)] = arr[keep]
+        self.count = len(keep)
+
+    def rects(self, mask=None):
+        ''' list of Rects of live arrows (where mask is true, if given) '''
+        n = self.count
+        boxes = np.hstack([self.pos[:n], self.size[:n]])
+        if mask is not None: boxes = boxes[mask]
+        return [pygame.Rect(box) for box in boxes.tolist()]
+
+    def draw(self, surface, alpha=1):
+        ''' draw every arrow in one batch.
+        alpha: how far between the last two ticks to draw arrows (see Object.draw_pos)
+        returns list of Rects of surface that were drawn on '''
+        n = self.count
+        if not n: return []
+        pos = self.pos[:n]
+        if self.moved and alpha < 1: pos = pos -self.vel[:n]*(1 -alpha)
+        imgs = arrow_images()
+        drawn = surface.blits(list(zip([imgs[d] for d in self.dir[:n].tolist()], np.round(pos).tolist())))
+        if len(drawn) > MAX_ARROW_RECTS: return [drawn[0].unionall(drawn[1:])]
+        return drawn
 
 
 class Spike(Object):
@@ -656,9 +802,12 @@ class Spike(Object):
 
 class Key(Entity):
     ''' collectable key '''
+    dynamic = True
+    moves = True
+
     def __init__(self, x, y):
         super().__init__('key-sheet', x, y)
-        from main import MOVE_SPEED
+        from game import MOVE_SPEED
         self.speed = MOVE_SPEED*3/4
         self.follow_radii = [ANIMATION_DATA['player-sheet'][0], ANIMATION_DATA['player-sheet'][0]*1.5]  # [min_dis, max_dis]
         self.follow_obj = None
@@ -666,11 +815,11 @@ class Key(Entity):
     def update(self):
         ''' runs every frame '''
         if self.follow_obj != None:
-            move_vec = np.array(self.follow_obj.rect.center) - np.array(self.rect.center)
-            dis = np.linalg.norm(move_vec)
-            if dis <= self.follow_radii[0]: move_vec = [0,0]
-            elif dis > self.follow_radii[1] +self.speed: move_vec = scale_vector(move_vec, dis -self.follow_radii[1])
-            else: move_vec = scale_vector(move_vec, self.speed)
+            move_vec = vec.sub(self.follow_obj.rect.center, self.rect.center)
+            dis = vec.length(move_vec)
+            if dis <= self.follow_radii[0]: move_vec = (0, 0)
+            elif dis > self.follow_radii[1] +self.speed: move_vec = vec.scale(move_vec, dis -self.follow_radii[1])
+            else: move_vec = vec.scale(move_vec, self.speed)
             self.move(move_vec)
 
     def unlock_door(self, door, has_key):
@@ -678,10 +827,10 @@ class Key(Entity):
         door: Door obj to be unlocked
         has_key: obj which is unlocking the door (Player)'''
         door.set_animation_state('open') # unlock door
+        self.room.particles.emit(self.rect, 30, PARTICLE_COLORS['key'])
         play_sound('unlock')
         has_key.keys.remove(self)
-        from main import room
-        room.objs.remove(self)
+        self.room.remove_obj(self)
 
     def unlock_crate(self, crate, has_key):
         ''' unlock a door 
@@ -689,10 +838,11 @@ class Key(Entity):
         has_key: obj which is unlocking the door (Player)'''
         play_sound('crate-unlock')
         has_key.keys.remove(self)
-        from main import room
-        room.objs.remove(self)
-        room.objs.append(crate.contents)
-        room.objs.remove(crate)
+        room = self.room
+        room.particles.emit(crate.rect, 30, PARTICLE_COLORS['crate'])
+        room.remove_obj(self)
+        room.add_obj(crate.contents)
+        room.remove_obj(crate)
 
 
 class Powerup(Entity):
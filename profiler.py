@@ -0,0 +1,121 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+import time
+from collections import deque
+from contextlib import contextmanager
+import objects
+
+PHASES = ['tick', 'update', 'collision', 'draw', 'music', 'flip', 'prefetch'] # phases of the game loop, in order
+BUDGET = 1/objects.FPS # seconds of work per frame before it counts as a hitch
+WINDOW = 120 # frames used for rolling stats
+
+class Phase(object):
+    ''' context manager that times one phase of a frame.
+    time spent in nested phases isn't counted (e.g. collision isn't part of update) '''
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.stack.append(self)
+        self.child_time = 0
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() -self.start
+        stack = self.profiler.stack
+        stack.pop()
+        if stack: stack[-1].child_time += elapsed
+        frame = self.profiler.frame
+        frame[self.name] = frame.get(self.name, 0) +elapsed -self.child_time
+
+
+class NullPhase(object):
+    ''' used instead of Phase when the profiler is off '''
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+
+class FrameProfiler(object):
+    ''' times each phase of the game loop every frame.
+    keeps rolling stats for an overlay, and writes every frame to a CSV file if one is open (see open_csv).
+    frames aren't kept in memory, so profiling can stay on for a long game '''
+    def __init__(self, budget=BUDGET, window=WINDOW):
+        self.enabled = False
+        self.budget = budget
+        self.phases = {} # name: Phase
+        self.null_phase = NullPhase()
+        self.stack = [] # Phases currently being timed
+        self.frame = {} # phase name: seconds, for current frame
+        self.recent = deque(maxlen=window) # recent frame dicts
+        self.csv = None # file every frame is written to, set by open_csv
+        self.hitches = 0 # frames where work (everything but tick) went over budget
+        self.frame_num = 0
+
+    def phase(self, name):
+        if not self.enabled: return self.null_phase
+        if name not in self.phases: self.phases[name] = Phase(self, name)
+        return self.phases[name]
+
+    def end_frame(self, room_num, obj_count):
+        ''' store times for the frame that just finished.
+        obj_count: objects in the room, counting each arrow (see objects.Arrows) '''
+        if not self.enabled: return
+        self.frame_num += 1
+        work = sum(t for name, t in self.frame.items() if name != 'tick')
+        self.frame['work'] = work
+        if work > self.budget: self.hitches += 1
+        self.recent.append(self.frame)
+        if self.csv != None: 
+            times = [f'{self.frame.get(name, 0)*1000:.4f}' for name in PHASES+['work']]
+            self.csv.write(f'{self.frame_num},{room_num},{obj_count},'+','.join(times)+'\n')
+        self.frame = {}
+
+    def stats(self, name):
+        ''' mean and 99th percentile of a phase over recent frames, in milliseconds '''
+        times = sorted(frame.get(name, 0) for frame in self.recent)
+        if not times: return 0, 0
+        return sum(times)/len(times)*1000, times[min(len(times)-1, int(len(times)*.99))]*1000
+
+    def recent_hitches(self):
+        return sum(frame['work'] > self.budget for frame in self.recent)
+
+    def open_csv(self, path):
+        ''' write times for every frame from now on to a CSV file (in milliseconds), until close_csv '''
+        self.close_csv()
+        self.csv = open(path, 'w')
+        self.csv.write('frame,room,objects,'+','.join(PHASES)+',work\n')
+
+    def close_csv(self):
+        if self.csv != None: self.csv.close()
+        self.csv = None
+
+frame_profiler = FrameProfiler()
+def phase(name):
+    ''' time a phase of the current frame with the shared profiler '''
+    return frame_profiler.phase(name)
+
+
+class BootProfiler(object):
+    ''' times each step of starting the game, and the time until the first frame is shown '''
+    def __init__(self, start=None):
+        self.start = start if start != None else time.perf_counter() # when booting started
+        self.phases = [] # (name, seconds) in order
+        self.first_frame = None # seconds from start to first frame shown
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.phases.append((name, time.perf_counter() -start))
+
+    def frame_shown(self):
+        ''' call after the first frame is shown '''
+        if self.first_frame == None: self.first_frame = time.perf_counter() -self.start
+
+    def report(self):
+        ''' {phase name: milliseconds}, including time_to_first_frame '''
+        report = {name: round(seconds*1000, 3) for name, seconds in self.phases}
+        report['time_to_first_frame'] = round(self.first_frame*1000, 3) if self.first_frame != None else None
+        return report
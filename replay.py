@@ -0,0 +1,106 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' record and replay games.
+a recording is the random seed, the Game's settings, and for every frame the keys held down
+and a checksum of the game state (see Game.state_hash).
+replaying feeds the keys back to a headless Game as fast as possible and checks every checksum.
+set main.RECORD_FILE to record.
+usage: python replay.py recording.rpl [--draw] [--profile profile.csv] '''
+
+import argparse
+import json
+import struct
+import time
+
+import pygame
+import game as game_module
+
+MAGIC = b'RPL1'
+HEADER = struct.Struct('<4sIH') # magic, seed, length of settings JSON
+FRAME = struct.Struct('<BI') # keys held down (bitmask of KEYS), state hash
+KEYS = [pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE] # every key the game reads
+
+
+### HELPER FUNCTIONS ###
+def pack_keys(inputs):
+    ''' bitmask of KEYS held down in inputs (Inputs or pygame.key.get_pressed()) '''
+    mask = 0
+    for i, key in enumerate(KEYS):
+        if inputs[key]: mask |= 1 << i
+    return mask
+
+def unpack_keys(mask):
+    ''' Inputs with KEYS in a bitmask held down '''
+    return game_module.Inputs([key for i, key in enumerate(KEYS) if mask & 1 << i])
+
+def load(path):
+    ''' returns seed, Game settings (dict), and list of (key bitmask, state hash) for each frame '''
+    with open(path, 'rb') as f: data = f.read()
+    magic, seed, settings_len = HEADER.unpack_from(data)
+    if magic != MAGIC: raise ValueError(f'{path} is not a recording')
+    settings = json.loads(data[HEADER.size:HEADER.size +settings_len])
+    settings['room_clears'] = {int(room_num): clears for room_num, clears in settings['room_clears'].items()} # JSON keys are strs
+    frames = list(FRAME.iter_unpack(data[HEADER.size +settings_len:]))
+    return seed, settings, frames
+
+
+### RECORDING ###
+class Recorder(object):
+    ''' records the keys held down and the game state every frame.
+    must be created right after the Game, before it's stepped '''
+    def __init__(self, game, path):
+        self.path = path
+        settings = {'screen_size': [game.screen_width, game.screen_height], 'debug_room': game.debug_room,
+            'debug_start_pos': game.debug_start_pos, 'room_clears': game.room_to_clears}
+        settings = json.dumps(settings).encode()
+        self.data = bytearray(HEADER.pack(MAGIC, game.seed, len(settings)) +settings)
+        self.game = game
+
+    def frame(self, inputs):
+        ''' record a frame. call after Game.step with the inputs it was given '''
+        self.data += FRAME.pack(pack_keys(inputs), self.game.state_hash())
+
+    def close(self):
+        ''' write recording to file '''
+        with open(self.path, 'wb') as f: f.write(self.data)
+
+
+### REPLAY ###
+def replay(path, draw=False, profile_csv=None):
+    ''' play a recording headless as fast as possible.
+    returns first frame number where the game state doesn't match the recording (None if every frame matches) '''
+    import profiler
+    seed, settings, frames = load(path)
+    screen_size = tuple(settings.pop('screen_size'))
+    game = game_module.headless(screen_size, seed=seed, **settings)
+    if draw:
+        import main as renderer
+        renderer.set_screen(pygame.Surface(screen_size).convert())
+        renderer.game = game
+
+    prof = profiler.frame_profiler
+    prof.enabled = profile_csv != None
+    if profile_csv: prof.open_csv(profile_csv)
+    start = time.perf_counter()
+    for frame_num, (mask, state_hash) in enumerate(frames, 1):
+        with prof.phase('update'): game.step(unpack_keys(mask))
+        if draw:
+            with prof.phase('draw'): renderer.draw_world()
+        prof.end_frame(game.room.room_num, len(game.room.objs) +game.room.arrows.count)
+        if game.state_hash() != state_hash:
+            print(f'desync on frame {frame_num} (room {game.room.room_num})')
+            return frame_num
+    elapsed = time.perf_counter() -start
+    print(f'replayed {len(frames)} frames in {elapsed:.2f} s ({len(frames)/max(elapsed, 1e-9):.0f} fps), every frame matches')
+    prof.close_csv()
+
+def run():
+    parser = argparse.ArgumentParser(description='replay a recording and check it plays the same')
+    parser.add_argument('path', help='recording made with main.RECORD_FILE')
+    parser.add_argument('--draw', action='store_true', help='also draw every frame (offscreen)')
+    parser.add_argument('--profile', help='path to write per-frame times to (CSV, see profiler.py)')
+    args = parser.parse_args()
+    if replay(args.path, draw=args.draw, profile_csv=args.profile) != None: raise SystemExit(1)
+
+if __name__ == '__main__': run()
@@ -0,0 +1,194 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+import numpy as np
+import pygame
+
+CELL_SIZE = 128 # width and height of a spatial hash cell in pixels (size of the largest sprite)
+
+class SpatialHash(object):
+    ''' uniform grid that buckets objects by the cells their rects overlap.
+    used by rooms so collision queries only look at nearby objects '''
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (col, row): list of objects in cell
+        self.obj_cells = {} # obj: (left, top, right, bottom) range of cells obj is in
+
+    def cell_range(self, rect):
+        ''' range of cells overlapped by a Rect (inclusive) '''
+        s = self.cell_size
+        return (rect.left//s, rect.top//s, max(rect.right-1, rect.left)//s, max(rect.bottom-1, rect.top)//s)
+
+    def add(self, obj):
+        cells = self.cell_range(obj.rect)
+        self.obj_cells[obj] = cells
+        for col in range(cells[0], cells[2]+1):
+            for row in range(cells[1], cells[3]+1):
+                if (col, row) in self.cells: self.cells[(col, row)].append(obj)
+                else: self.cells[(col, row)] = [obj]
+
+    def remove(self, obj):
+        cells = self.obj_cells.pop(obj, None)
+        if cells == None: return
+        for col in range(cells[0], cells[2]+1):
+            for row in range(cells[1], cells[3]+1):
+                bucket = self.cells[(col, row)]
+                bucket.remove(obj)
+                if not bucket: del self.cells[(col, row)]
+
+    def move(self, obj):
+        ''' update cells of an object after its rect has changed '''
+        if self.obj_cells.get(obj) == self.cell_range(obj.rect): return # still in the same cells
+        self.remove(obj)
+        self.add(obj)
+
+    def query(self, rect):
+        ''' returns list of objects in the cells overlapped by rect.
+        objects are only candidates, their rects may not collide with rect '''
+        left, top, right, bottom = self.cell_range(rect)
+        if left == right and top == bottom: return list(self.cells.get((left, top), ()))
+        found = {}
+        for col in range(left, right+1):
+            for row in range(top, bottom+1):
+                for obj in self.cells.get((col, row), ()): found[obj] = None
+        return list(found)
+
+
+def sweep(rect, vel, rects):
+    ''' swept AABB collision: when a Rect moving by vel (in one tick) first touches one of rects.
+    unlike checking where the Rect ends up, this can't miss rects thinner than the distance moved.
+    rects the Rect already overlaps are ignored.
+    returns (time, normal, index): time (0 to 1) of the contact, side of the rect that was hit as a vector 
+    (e.g. (0, -1) for its top), and its index in rects. index is -1 if nothing is hit '''
+    dx, dy = vel
+    first = (1, (0, 0), -1)
+    if not dx and not dy: return first
+    for i, other in enumerate(rects):
+        # times the moving rect starts and stops overlapping other on each axis
+        if dx > 0: x_entry, x_exit = (other.left -rect.right)/dx, (other.right -rect.left)/dx
+        elif dx < 0: x_entry, x_exit = (other.right -rect.left)/dx, (other.left -rect.right)/dx
+        elif rect.right > other.left and rect.left < other.right: x_entry, x_exit = float('-inf'), float('inf')
+        else: continue
+        if dy > 0: y_entry, y_exit = (other.top -rect.bottom)/dy, (other.bottom -rect.top)/dy
+        elif dy < 0: y_entry, y_exit = (other.bottom -rect.top)/dy, (other.top -rect.bottom)/dy
+        elif rect.bottom > other.top and rect.top < other.bottom: y_entry, y_exit = float('-inf'), float('inf')
+        else: continue
+
+        entry = max(x_entry, y_entry)
+        if entry < 0 or entry >= min(x_exit, y_exit) or entry > first[0] or (entry == first[0] and first[2] != -1): continue
+        if x_entry > y_entry: first = (entry, (-1 if dx > 0 else 1, 0), i)
+        else: first = (entry, (0, -1 if dy > 0 else 1), i)
+    return first
+
+
+# occupancy grid layers (bit flags)
+SOLID = 1
+DEADLY = 2
+BREAKABLE = 4
+GRID_CELL_SIZE = 16 # width and height of an occupancy grid cell in pixels (divides spike and platform sizes)
+
+def layers(obj):
+    ''' occupancy grid layers an object is in '''
+    return SOLID*obj.solid | DEADLY*obj.deadly | BREAKABLE*(obj.breakable or obj.crumbles)
+
+class OccupancyGrid(object):
+    ''' objects of a room that don't move drawn into a grid of cells, with a bit (SOLID, DEADLY, BREAKABLE) for each layer.
+    a cell is in a layer if any part of it is covered by an object in that layer.
+    looking up a point is O(1), and areas or the whole map (e.g. for reachable) are NumPy array operations '''
+    def __init__(self, bounds, origin=(0, 0), cell_size=GRID_CELL_SIZE):
+        ''' bounds: Rect the grid covers (cells outside it are empty)
+        origin: point on a cell corner, so objects placed on a grid from it line up with cells '''
+        s = self.cell_size = cell_size
+        self.left = bounds.left -(bounds.left -origin[0])%s # x of the first column
+        self.top = bounds.top -(bounds.top -origin[1])%s
+        self.cols = -(-(bounds.right -self.left)//s)
+        self.rows = -(-(bounds.bottom -self.top)//s)
+        self.cells = np.zeros((self.rows, self.cols), np.uint8) # [row, col]: layers
+
+    def cell_range(self, rect):
+        ''' slices of rows and columns covered by a Rect, clipped to the grid '''
+        s = self.cell_size
+        left, top = max((rect.left -self.left)//s, 0), max((rect.top -self.top)//s, 0)
+        right, bottom = min(-(-(rect.right -self.left)//s), self.cols), min(-(-(rect.bottom -self.top)//s), self.rows)
+        return slice(top, max(bottom, top)), slice(left, max(right, left))
+
+    def cell_rect(self, rows, cols):
+        ''' Rect in pixels of a range of cells (from cell_range) '''
+        s = self.cell_size
+        return pygame.Rect(self.left +cols.start*s, self.top +rows.start*s, (cols.stop -cols.start)*s, (rows.stop -rows.start)*s)
+
+    def cell(self, x, y):
+        ''' (col, row) of the cell a point is in '''
+        return int((x -self.left)//self.cell_size), int((y -self.top)//self.cell_size)
+
+    def add(self, obj):
+        ''' draw an object into the layers it's in '''
+        flags = layers(obj)
+        if flags: self.cells[self.cell_range(obj.rect)] |= flags
+
+    def add_all(self, objs):
+        ''' draw every object in objs. faster than add for each object (used when a room is built) '''
+        boxes = np.array([(obj.rect.left, obj.rect.top, obj.rect.right, obj.rect.bottom, layers(obj)) for obj in objs], np.int64).reshape(-1, 5)
+        boxes = boxes[boxes[:, 4] != 0]
+        if not len(boxes): return
+        # cell ranges of every object at once, clipped to the grid
+        s = self.cell_size
+        left = np.minimum(np.maximum((boxes[:, 0] -self.left)//s, 0), self.cols)
+        top = np.minimum(np.maximum((boxes[:, 1] -self.top)//s, 0), self.rows)
+        right = np.minimum(-(-(boxes[:, 2] -self.left)//s), self.cols)
+        bottom = np.minimum(-(-(boxes[:, 3] -self.top)//s), self.rows)
+
+        # which rows and columns each object covers. multiplying them counts the objects covering each cell
+        in_rows = ((np.arange(self.rows) >= top[:, None]) & (np.arange(self.rows) < bottom[:, None])).astype(np.float32)
+        in_cols = ((np.arange(self.cols) >= left[:, None]) & (np.arange(self.cols) < right[:, None])).astype(np.float32)
+        for flag in [SOLID, DEADLY, BREAKABLE]:
+            has = (boxes[:, 4] & flag) != 0
+            if has.any(): self.cells[in_rows[has].T @ in_cols[has] > 0] |= flag
+
+    def clear(self, rect):
+        ''' empty the cells covered by rect. returns Rect of the cleared cells '''
+        rows, cols = self.cell_range(rect)
+        self.cells[rows, cols] = 0
+        return self.cell_rect(rows, cols)
+
+    def at(self, x, y):
+        ''' layers of the cell a point is in (0 outside the grid) '''
+        col, row = self.cell(x, y)
+        if 0 <= col < self.cols and 0 <= row < self.rows: return int(self.cells[row, col])
+        return 0
+
+    def area(self, rect):
+        ''' layers of any cell covered by rect '''
+        cells = self.cells[self.cell_range(rect)]
+        if not cells.size: return 0
+        return int(np.bitwise_or.reduce(cells, axis=None))
+
+    def layer(self, flags):
+        ''' bool array of cells in any of flags, indexed [row, col] '''
+        return (self.cells & flags) != 0
+
+    def reachable(self, start, size=(1, 1), blocked=None):
+        ''' cells something size cells wide and tall can get to from start (col, row), moving up, down, left, and right.
+        blocked: bool array of cells it can't overlap (default SOLID and DEADLY cells)
+        returns bool array of the top left cells of every position it can reach '''
+        if blocked is None: blocked = self.layer(SOLID | DEADLY)
+        # positions where the whole size fits without overlapping a blocked cell
+        w, h = size
+        fits = np.zeros_like(blocked)
+        fits[:self.rows -h +1, :self.cols -w +1] = True
+        for dy in range(h):
+            for dx in range(w): fits[:self.rows -h +1, :self.cols -w +1] &= ~blocked[dy:self.rows -h +1 +dy, dx:self.cols -w +1 +dx]
+
+        reached = np.zeros_like(fits)
+        col, row = start
+        if not (0 <= col < self.cols and 0 <= row < self.rows) or not fits[row, col]: return reached
+        reached[row, col] = True
+        while True: # spread to neighbouring cells until nothing changes
+            grown = reached.copy()
+            grown[1:] |= reached[:-1]
+            grown[:-1] |= reached[1:]
+            grown[:, 1:] |= reached[:, :-1]
+            grown[:, :-1] |= reached[:, 1:]
+            grown &= fits
+            if (grown == reached).all(): return reached
+            reached = grown
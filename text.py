@@ -0,0 +1,32 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+from collections import OrderedDict
+
+class TextCache(object):
+    ''' caches rendered text Surfaces so labels are only rendered when their text changes.
+    least recently used Surfaces are removed when the cache is full '''
+    def __init__(self, size=256):
+        self.size = size # max number of Surfaces kept
+        self.surfaces = OrderedDict() # (font, string, color): Surface
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, string, color):
+        ''' returns antialiased Surface with string rendered in font and color '''
+        key = (font, string, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface != None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(string, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.size: self.surfaces.popitem(last=False)
+        return surface
+
+cache = TextCache()
+def render(font, string, color):
+    ''' render text using the shared cache '''
+    return cache.render(font, string, color)
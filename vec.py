@@ -0,0 +1,68 @@
+# Author: Griffin Leonard
+# Created: 10/16/26
+
+''' 2D vector math with tuples.
+for 2 element vectors this is much faster than NumPy, which has a lot of overhead per call.
+run this file to compare against the NumPy version used before (python vec.py) '''
+
+import math
+
+# unit vectors for 8-direction input, keyed by (x, y) where x and y are -1, 0, or 1
+UNIT_8 = {(x, y): (x/math.hypot(x, y), y/math.hypot(x, y)) if x or y else (0, 0) for x in (-1, 0, 1) for y in (-1, 0, 1)}
+
+def sign(n):
+    ''' -1, 0, or 1 '''
+    return (n > 0) -(n < 0)
+
+def sub(a, b):
+    return (a[0] -b[0], a[1] -b[1])
+
+def length(vec):
+    return math.hypot(vec[0], vec[1])
+
+def scale(vec, size):
+    ''' vec scaled to a length of size. (0, 0) stays (0, 0) '''
+    unit = UNIT_8.get(vec)
+    if unit == None:
+        dis = math.hypot(vec[0], vec[1])
+        if not dis: return (0, 0)
+        return (vec[0]*size/dis, vec[1]*size/dis)
+    return (unit[0]*size, unit[1]*size)
+
+
+### MICRO-BENCHMARK ###
+def numpy_scale(vec, size):
+    ''' objects.scale_vector before this module, for comparison '''
+    import numpy as np
+    try: angle = np.arctan(vec[1]/vec[0]) # in radians
+    except:
+        if vec[1] == 1: angle = math.pi/2
+        elif vec[1] == -1: angle = math.pi*3/2
+        else: angle = 0
+    sign = np.sign(vec)
+    return np.array([sign[0]*size*abs(math.cos(angle)), sign[1]*size*abs(math.sin(angle))])
+
+def numpy_follow(a, b):
+    ''' vector and distance between two points, the way Key.update did it before this module '''
+    import numpy as np
+    move_vec = np.array(a) -np.array(b)
+    return move_vec, np.linalg.norm(move_vec)
+
+def benchmark(n=100000):
+    ''' print time per call of the NumPy and tuple versions of each hot path '''
+    import timeit
+    import warnings
+    warnings.simplefilter('ignore') # numpy warns when dividing by 0
+    cases = [
+        ('8-direction input', lambda: numpy_scale([1, -1], 5), lambda: scale((1, -1), 5)),
+        ('no input', lambda: numpy_scale([0, 0], 5), lambda: scale((0, 0), 5)),
+        ('key follow', lambda: numpy_scale(numpy_follow((300, 200), (250, 260))[0], 3.75),
+            lambda: scale(sub((300, 200), (250, 260)), 3.75)),
+        ('distance', lambda: numpy_follow((300, 200), (250, 260)), lambda: length(sub((300, 200), (250, 260)))) ]
+    print(f'{"":<20}{"numpy":>12}{"tuple":>12}{"speedup":>10}')
+    for name, numpy_fn, tuple_fn in cases:
+        numpy_time = min(timeit.repeat(numpy_fn, number=n, repeat=3))/n*1e9
+        tuple_time = min(timeit.repeat(tuple_fn, number=n, repeat=3))/n*1e9
+        print(f'{name:<20}{numpy_time:>9.0f} ns{tuple_time:>9.0f} ns{numpy_time/tuple_time:>9.1f}x')
+
+if __name__ == '__main__': benchmark()